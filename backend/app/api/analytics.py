@@ -1,60 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+import orjson
+import uuid
 
 from ..database import get_db
 from ..models import Conversation
-from ..services.analytics import AnalyticsService
+from ..services.analytics import (
+    AnalyticsService,
+    generate_analytics_in_background,
+    get_generation_status,
+    set_generation_status,
+)
 
 router = APIRouter()
 
 
+async def _assert_conversation_exists(db: AsyncSession, conversation_id: int) -> None:
+    """404 unless the conversation exists, without loading the row."""
+    exists = await db.scalar(select(1).where(Conversation.id == conversation_id))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
 @router.get("/{conversation_id}")
 async def get_cached_analytics(
     conversation_id: int,
     db: AsyncSession = Depends(get_db),
 ):
     """Get cached analytics if available."""
-    # Verify conversation exists
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
+    await _assert_conversation_exists(db, conversation_id)
 
     analytics_service = AnalyticsService(db)
     result = analytics_service.get_cached_analytics(conversation_id)
 
     if result:
-        return result
+        return Response(content=orjson.dumps(result), media_type="application/json")
 
     # Return 404 if no cached analytics
     raise HTTPException(status_code=404, detail="No cached analytics found")
 
 
-@router.post("/{conversation_id}")
+@router.post("/{conversation_id}", status_code=202)
 async def generate_analytics(
     conversation_id: int,
+    background_tasks: BackgroundTasks,
     person1: Optional[str] = Query(None, description="First person to compare"),
     person2: Optional[str] = Query(None, description="Second person to compare"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Generate analytics charts for a conversation."""
+    """Queue analytics generation for a conversation.
+
+    Poll the status endpoint; once completed, the result is served by the
+    cached analytics endpoint.
+    """
     # Verify conversation exists
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
+    message_count = await db.scalar(
+        select(Conversation.message_count).where(Conversation.id == conversation_id)
+    )
+    if message_count is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.generate_analytics(
-            conversation_id,
-            person1=person1,
-            person2=person2,
-        )
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate analytics: {str(e)}")
+    if not message_count:
+        raise HTTPException(status_code=400, detail="No messages found for analysis")
+
+    # Don't start a second run while one is in flight
+    job = await get_generation_status(conversation_id)
+    if job and job["status"] in ("queued", "running"):
+        message = "Analytics generation is already in progress"
+        if person1 or person2:
+            message += "; person1 and person2 were not applied"
+        return {**job, "message": message}
+
+    run_id = uuid.uuid4().hex
+    job = await set_generation_status(conversation_id, "queued", run_id)
+    background_tasks.add_task(generate_analytics_in_background, conversation_id, run_id, person1, person2)
+    return job
+
+
+@router.get("/{conversation_id}/status")
+async def get_analytics_status(conversation_id: int):
+    """Get the status of the latest analytics generation."""
+    job = await get_generation_status(conversation_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No analytics generation found")
+    return job
 
 
 @router.get("/{conversation_id}/participants")
@@ -63,9 +94,7 @@ async def get_analytics_participants(
     db: AsyncSession = Depends(get_db),
 ):
     """Get participants for analytics selection."""
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
+    await _assert_conversation_exists(db, conversation_id)
 
     analytics_service = AnalyticsService(db)
     participants = await analytics_service.get_participants(conversation_id)
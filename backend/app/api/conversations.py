@@ -1,15 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, update, delete
+from sqlalchemy.orm import selectinload, joinedload, raiseload, load_only
 from typing import Optional
+import secrets
 
-from ..database import get_db
+from ..database import get_db, get_estimated_count
 from ..models import Conversation, Participant
-from ..schemas import ConversationResponse, ConversationListResponse, ConversationUpdate
+from ..schemas import ConversationResponse, ConversationListItem, ConversationListResponse, ConversationUpdate
+from ..services.search import invalidate_search_cache
+from .pagination import page_count, split_page
+from .responses import render_json
 
 router = APIRouter()
 
+_CONV_LIST_ADAPTER = TypeAdapter(list[ConversationListItem])
+
+# The list only shows how many participants a conversation has
+_participant_count = (
+    select(func.count())
+    .where(Participant.conversation_id == Conversation.id)
+    .correlate(Conversation)
+    .scalar_subquery()
+    .label("participant_count")
+)
+
 
 @router.get("", response_model=ConversationListResponse)
 async def list_conversations(
@@ -18,37 +34,74 @@ async def list_conversations(
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """List all conversations with pagination."""
-    offset = (page - 1) * per_page
+    """List all conversations with pagination.
 
-    # Base query
-    stmt = select(Conversation).options(selectinload(Conversation.participants))
-
-    # Search filter
-    if search:
-        stmt = stmt.where(Conversation.name.ilike(f"%{search}%"))
+    Without a search filter, total is the planner's row estimate and may be
+    approximate; it is exact once the last page has been reached.
+    """
+    offset = (page - 1) * per_page
 
-    # Count total
     count_stmt = select(func.count()).select_from(Conversation)
+
     if search:
+        # Filtered: the total row count rides along as a window column
+        stmt = (
+            select(Conversation, _participant_count, func.count().over().label("total"))
+            .where(Conversation.name.ilike(f"%{search}%"))
+        )
         count_stmt = count_stmt.where(Conversation.name.ilike(f"%{search}%"))
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+    else:
+        stmt = select(Conversation, _participant_count)
 
     # Get paginated results
+    stmt = stmt.options(
+        load_only(
+            Conversation.id,
+            Conversation.name,
+            Conversation.is_group,
+            Conversation.share_token,
+            Conversation.message_count,
+            Conversation.first_message_at,
+            Conversation.last_message_at,
+            Conversation.created_at,
+        ),
+        raiseload("*"),
+    )
     stmt = stmt.order_by(Conversation.last_message_at.desc().nullslast())
-    stmt = stmt.offset(offset).limit(per_page)
+    stmt = stmt.offset(offset).limit(per_page + 1)
 
     result = await db.execute(stmt)
-    conversations = result.scalars().all()
-
-    return ConversationListResponse(
-        items=[ConversationResponse.model_validate(c) for c in conversations],
+    rows, has_more = split_page(result.all(), per_page)
+    conversations = [row.Conversation for row in rows]
+
+    if rows and not has_more:
+        # On the last page the total is known exactly
+        total = offset + len(rows)
+    elif rows and search:
+        total = rows[0].total
+    elif rows:
+        estimate = await get_estimated_count(db, Conversation.__tablename__)
+        if estimate is None:
+            total = await db.scalar(count_stmt) or 0
+        else:
+            total = max(estimate, offset + len(rows) + 1)
+    elif page > 1:
+        # Past the last page there is no row to carry the count
+        total = await db.scalar(count_stmt) or 0
+    else:
+        total = 0
+
+    items = _CONV_LIST_ADAPTER.validate_python(conversations, from_attributes=True)
+    for item, row in zip(items, rows):
+        item.participant_count = row.participant_count
+
+    return render_json(ConversationListResponse(
+        items=items,
         total=total,
         page=page,
         per_page=per_page,
-        pages=(total + per_page - 1) // per_page if total > 0 else 0,
-    )
+        pages=page_count(total, per_page),
+    ))
 
 
 @router.get("/{conversation_id}", response_model=ConversationResponse)
@@ -59,11 +112,11 @@ async def get_conversation(
     """Get a single conversation by ID."""
     stmt = (
         select(Conversation)
-        .options(selectinload(Conversation.participants))
+        .options(joinedload(Conversation.participants), raiseload("*"))
         .where(Conversation.id == conversation_id)
     )
     result = await db.execute(stmt)
-    conversation = result.scalar_one_or_none()
+    conversation = result.unique().scalar_one_or_none()
 
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -78,7 +131,11 @@ async def update_conversation(
     db: AsyncSession = Depends(get_db),
 ):
     """Update a conversation."""
-    conversation = await db.get(Conversation, conversation_id)
+    conversation = await db.get(
+        Conversation,
+        conversation_id,
+        options=[selectinload(Conversation.participants)],
+    )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -86,15 +143,7 @@ async def update_conversation(
         conversation.name = update.name
 
     await db.commit()
-
-    # Reload with participants
-    stmt = (
-        select(Conversation)
-        .options(selectinload(Conversation.participants))
-        .where(Conversation.id == conversation_id)
-    )
-    result = await db.execute(stmt)
-    conversation = result.scalar_one()
+    invalidate_search_cache(conversation_id)
 
     return ConversationResponse.model_validate(conversation)
 
@@ -105,12 +154,20 @@ async def delete_conversation(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a conversation and all its messages."""
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
+    # Children go through the foreign keys' ON DELETE CASCADE instead of
+    # being loaded into the session for ORM cascades
+    stmt = (
+        delete(Conversation)
+        .where(Conversation.id == conversation_id)
+        .returning(Conversation.id)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    await db.delete(conversation)
     await db.commit()
+    invalidate_search_cache(conversation_id)
 
     return {"status": "deleted"}
 
@@ -121,12 +178,8 @@ async def generate_share_link(
     db: AsyncSession = Depends(get_db),
 ):
     """Generate a share token for a conversation."""
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    token = conversation.generate_share_token()
-    await db.commit()
+    token = secrets.token_urlsafe(32)
+    await _replace_share_token(db, conversation_id, token)
 
     return {"share_token": token, "share_url": f"/shared/{token}"}
 
@@ -137,11 +190,22 @@ async def revoke_share_link(
     db: AsyncSession = Depends(get_db),
 ):
     """Revoke the share token for a conversation."""
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation:
+    await _replace_share_token(db, conversation_id, None)
+
+    return {"status": "revoked"}
+
+
+async def _replace_share_token(db: AsyncSession, conversation_id: int, token: Optional[str]) -> None:
+    """Set a conversation's share token in a single UPDATE ... RETURNING."""
+    stmt = (
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(share_token=token)
+        .returning(Conversation.id)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    conversation.revoke_share_token()
     await db.commit()
-
-    return {"status": "revoked"}
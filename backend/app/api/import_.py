@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
+import os
 
 from ..database import get_db
 from ..schemas import (
@@ -14,6 +15,16 @@ from ..services.importer import ImporterService
 router = APIRouter()
 
 
+def _upload_size(file: UploadFile) -> int:
+    """Size of an uploaded file without reading it into memory."""
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
 @router.post("/init", response_model=ImportJobResponse)
 async def init_import(
     job_data: ImportJobCreate,
@@ -37,10 +48,11 @@ async def upload_chunk(
     db: AsyncSession = Depends(get_db),
 ):
     """Upload a chunk of the import file."""
-    chunk_data = await file.read()
-
     importer = ImporterService(db)
-    job = await importer.upload_chunk(job_id, chunk_number, chunk_data)
+    try:
+        job = await importer.upload_chunk(job_id, chunk_number, file.file, _upload_size(file))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return ChunkUploadResponse(
         job_id=job.id,
@@ -57,19 +69,19 @@ async def upload_simple(
     db: AsyncSession = Depends(get_db),
 ):
     """Simple single-file upload for smaller files (< 100MB recommended)."""
-    content = await file.read()
+    file_size = _upload_size(file)
 
     importer = ImporterService(db)
 
     # Create job
     job = await importer.create_import_job(
         filename=file.filename or "upload.txt",
-        file_size=len(content),
+        file_size=file_size,
         total_chunks=1,
     )
 
-    # Upload as single chunk
-    job = await importer.upload_chunk(job.id, 0, content)
+    # Upload as single chunk, streamed from the spooled upload file
+    job = await importer.upload_chunk(job.id, 0, file.file, file_size)
 
     return ImportJobResponse.model_validate(job)
 
@@ -92,36 +104,12 @@ async def get_import_progress(
 ):
     """Get the progress of an import job."""
     importer = ImporterService(db)
-    job = await importer.get_import_progress(job_id)
+    progress = await importer.get_import_progress(job_id)
 
-    if not job:
+    if not progress:
         raise HTTPException(status_code=404, detail="Import job not found")
 
-    # Calculate progress percentage
-    progress = 0.0
-    if job.status == "uploading":
-        if job.total_chunks > 0:
-            progress = (job.uploaded_chunks / job.total_chunks) * 50  # Upload is 50%
-    elif job.status == "processing":
-        if job.total_messages > 0:
-            msg_progress = (job.processed_messages / job.total_messages) * 40
-            media_progress = 0
-            if job.total_media > 0:
-                media_progress = (job.processed_media / job.total_media) * 10
-            progress = 50 + msg_progress + media_progress  # Processing is other 50%
-    elif job.status == "completed":
-        progress = 100.0
-
-    return ImportProgressResponse(
-        job_id=job.id,
-        status=job.status,
-        progress_percent=progress,
-        total_messages=job.total_messages,
-        processed_messages=job.processed_messages,
-        total_media=job.total_media,
-        processed_media=job.processed_media,
-        error_message=job.error_message,
-    )
+    return ImportProgressResponse(**progress._mapping)
 
 
 @router.get("/jobs", response_model=list[ImportJobResponse])
@@ -4,31 +4,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import MediaFile
-from ..services.storage import StorageService
+from ..services.storage import StorageService, get_storage
 
 router = APIRouter()
 
+# Redirect targets are signed for a day; browsers may reuse the redirect for
+# 23 hours, which stays inside the URL's validity even when the presigned URL
+# itself came out of the storage cache.
+MEDIA_URL_EXPIRES_HOURS = 24
+MEDIA_REDIRECT_HEADERS = {"Cache-Control": "private, max-age=82800"}
+
 
 @router.get("/{media_id}")
 async def get_media(
     media_id: int,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Get a media file by redirecting to a presigned URL."""
     media = await db.get(MediaFile, media_id)
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    storage = StorageService()
-    url = storage.get_presigned_url(media.storage_key, expires_hours=1)
+    url = storage.get_presigned_url(media.storage_key, expires_hours=MEDIA_URL_EXPIRES_HOURS)
 
-    return RedirectResponse(url=url)
+    return RedirectResponse(url=url, headers=MEDIA_REDIRECT_HEADERS)
 
 
 @router.get("/{media_id}/thumbnail")
 async def get_media_thumbnail(
     media_id: int,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Get a media thumbnail by redirecting to a presigned URL."""
     media = await db.get(MediaFile, media_id)
@@ -38,23 +45,24 @@ async def get_media_thumbnail(
     if not media.thumbnail_key:
         raise HTTPException(status_code=404, detail="Thumbnail not available")
 
-    storage = StorageService()
-    url = storage.get_presigned_url(media.thumbnail_key, expires_hours=1)
+    url = storage.get_presigned_url(media.thumbnail_key, expires_hours=MEDIA_URL_EXPIRES_HOURS)
 
-    return RedirectResponse(url=url)
+    return RedirectResponse(url=url, headers=MEDIA_REDIRECT_HEADERS)
 
 
 @router.get("/{media_id}/info")
 async def get_media_info(
     media_id: int,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Get media file information."""
     media = await db.get(MediaFile, media_id)
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    storage = StorageService()
+    keys = [media.storage_key, media.thumbnail_key] if media.thumbnail_key else [media.storage_key]
+    urls = storage.presign_many(keys, expires_hours=1)
 
     return {
         "id": media.id,
@@ -63,6 +71,6 @@ async def get_media_info(
         "mime_type": media.mime_type,
         "file_size": media.file_size,
         "original_filename": media.original_filename,
-        "url": storage.get_presigned_url(media.storage_key, expires_hours=1),
-        "thumbnail_url": storage.get_presigned_url(media.thumbnail_key, expires_hours=1) if media.thumbnail_key else None,
+        "url": urls[media.storage_key],
+        "thumbnail_url": urls.get(media.thumbnail_key),
     }
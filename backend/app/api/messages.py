@@ -1,33 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import selectinload, raiseload
 from typing import Optional
 from datetime import datetime
 
 from ..database import get_db
-from ..models import Message, Participant
-from ..schemas import MessageResponse, MessageListResponse
-from ..services.storage import StorageService
+from ..models import Conversation, Message
+from ..schemas import MessageResponse, MessageListResponse, MessageContextResponse
+from ..services.storage import StorageService, get_storage
+from .pagination import decode_cursor, encode_cursor, page_count, split_page
+from .responses import collect_media_keys, enrich_message_response, enrich_message_responses, render_json
 
 router = APIRouter()
 
-
-def enrich_message_response(message: Message, storage: StorageService) -> MessageResponse:
-    """Enrich message with participant color and media URLs."""
-    response = MessageResponse.model_validate(message)
-
-    # Add participant color
-    if message.participant:
-        response.participant_color = message.participant.color
-
-    # Add media URLs
-    for media in response.media_files:
-        media.url = storage.get_presigned_url(media.storage_key)
-        if media.thumbnail_key:
-            media.thumbnail_url = storage.get_presigned_url(media.thumbnail_key)
-
-    return response
+# Base statements built once at import; handlers only add filters and paging
+MESSAGE_STMT = select(Message).options(
+    selectinload(Message.media_files),
+    raiseload("*"),
+)
+# A page of messages with the total row count as a window column
+MESSAGE_PAGE_STMT = select(Message, func.count().over().label("total")).options(
+    selectinload(Message.media_files),
+    raiseload("*"),
+)
+MESSAGE_COUNT_STMT = select(func.count()).select_from(Message)
 
 
 @router.get("/conversation/{conversation_id}", response_model=MessageListResponse)
@@ -37,89 +34,101 @@ async def get_messages(
     per_page: int = Query(50, ge=1, le=200),
     before: Optional[datetime] = None,
     after: Optional[datetime] = None,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
-    """Get paginated messages for a conversation."""
-    offset = (page - 1) * per_page
-
-    # Base query
-    stmt = (
-        select(Message)
-        .options(
-            selectinload(Message.participant),
-            selectinload(Message.media_files),
-        )
-        .where(Message.conversation_id == conversation_id)
-    )
+    """Get paginated messages for a conversation.
+
+    Pass the previous response's next_cursor as cursor to seek straight to the
+    next page instead of using page offsets. total always counts the whole
+    conversation, or the messages matching the time filters when given.
+    """
+    offset = 0 if cursor else (page - 1) * per_page
+    filtered = before is not None or after is not None
+
+    # Only filtered page requests count with a window column; it makes
+    # Postgres read every matching row, so keyset pages must not carry it
+    base_stmt = MESSAGE_PAGE_STMT if filtered and not cursor else MESSAGE_STMT
+    stmt = base_stmt.where(Message.conversation_id == conversation_id)
+    count_stmt = MESSAGE_COUNT_STMT.where(Message.conversation_id == conversation_id)
 
     # Time filters
     if before:
         stmt = stmt.where(Message.timestamp < before)
-    if after:
-        stmt = stmt.where(Message.timestamp > after)
-
-    # Count total
-    count_stmt = select(func.count()).select_from(Message).where(Message.conversation_id == conversation_id)
-    if before:
         count_stmt = count_stmt.where(Message.timestamp < before)
     if after:
+        stmt = stmt.where(Message.timestamp > after)
         count_stmt = count_stmt.where(Message.timestamp > after)
 
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+    # Keyset filter
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Message.timestamp, Message.id) < tuple_(cursor_ts, cursor_id))
 
     # Get paginated results - newest first (DESC)
-    stmt = stmt.order_by(Message.timestamp.desc())
-    stmt = stmt.offset(offset).limit(per_page)
+    stmt = stmt.order_by(Message.timestamp.desc(), Message.id.desc())
+    # One extra row tells whether another page follows
+    stmt = stmt.offset(offset).limit(per_page + 1)
 
     result = await db.execute(stmt)
-    messages = result.scalars().all()
+    rows, has_more = split_page(result.all(), per_page)
+    messages = [row.Message for row in rows]
+
+    if not filtered:
+        # Unfiltered: the conversation's stored message_count is the total
+        total = await db.scalar(
+            select(Conversation.message_count).where(Conversation.id == conversation_id)
+        ) or 0
+    elif cursor:
+        total = await db.scalar(count_stmt) or 0
+    elif rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page there is no row to carry the count
+        total = await db.scalar(count_stmt) or 0
+    else:
+        total = 0
 
     # Enrich responses
-    storage = StorageService()
-    enriched = [enrich_message_response(m, storage) for m in messages]
+    urls = storage.presign_many(collect_media_keys(messages))
+    enriched = enrich_message_responses(messages, urls)
 
-    pages = (total + per_page - 1) // per_page if total > 0 else 0
-
-    return MessageListResponse(
+    return render_json(MessageListResponse(
         items=enriched,
         total=total,
         page=page,
         per_page=per_page,
-        pages=pages,
-        has_more=page < pages,
-    )
+        pages=page_count(total, per_page),
+        has_more=has_more,
+        next_cursor=encode_cursor(messages[-1]) if has_more else None,
+    ))
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
 async def get_message(
     message_id: int,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Get a single message by ID."""
-    stmt = (
-        select(Message)
-        .options(
-            selectinload(Message.participant),
-            selectinload(Message.media_files),
-        )
-        .where(Message.id == message_id)
-    )
+    stmt = MESSAGE_STMT.where(Message.id == message_id)
     result = await db.execute(stmt)
     message = result.scalar_one_or_none()
 
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
-    storage = StorageService()
-    return enrich_message_response(message, storage)
+    urls = storage.presign_many(collect_media_keys([message]))
+    return enrich_message_response(message, urls)
 
 
-@router.get("/{message_id}/context")
+@router.get("/{message_id}/context", response_model=MessageContextResponse)
 async def get_message_context(
     message_id: int,
     context_size: int = Query(5, ge=1, le=50),
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
     """Get messages around a specific message for context."""
     from ..services.search import SearchService
@@ -130,10 +139,12 @@ async def get_message_context(
     if not context["target"]:
         raise HTTPException(status_code=404, detail="Message not found")
 
-    storage = StorageService()
+    urls = storage.presign_many(
+        collect_media_keys([*context["before"], context["target"], *context["after"]])
+    )
 
-    return {
-        "before": [enrich_message_response(m, storage) for m in context["before"]],
-        "target": enrich_message_response(context["target"], storage),
-        "after": [enrich_message_response(m, storage) for m in context["after"]],
-    }
+    return render_json(MessageContextResponse(
+        before=enrich_message_responses(context["before"], urls),
+        target=enrich_message_response(context["target"], urls),
+        after=enrich_message_responses(context["after"], urls),
+    ))
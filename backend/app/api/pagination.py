@@ -0,0 +1,31 @@
+"""Pagination helpers shared by the list endpoints."""
+from fastapi import HTTPException
+from datetime import datetime
+import base64
+
+from ..models import Message
+
+
+def page_count(total: int, per_page: int) -> int:
+    """Number of pages needed to show total items."""
+    return (total + per_page - 1) // per_page if total > 0 else 0
+
+
+def split_page(rows: list, per_page: int) -> tuple[list, bool]:
+    """Split rows fetched with limit(per_page + 1) into the page and whether more follow."""
+    return rows[:per_page], len(rows) > per_page
+
+
+def encode_cursor(message: Message) -> str:
+    """Encode a message's (timestamp, id) sort key as an opaque page cursor."""
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a page cursor back into its (timestamp, id) sort key."""
+    try:
+        timestamp, _, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
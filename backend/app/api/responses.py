@@ -0,0 +1,102 @@
+"""Response building helpers shared by the message endpoints."""
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ..models import Message
+from ..schemas import MessageResponse, MessageListResponse
+from ..services.search import SearchService, search_version
+from .pagination import decode_cursor, encode_cursor
+
+# Validating a whole page in one call stays inside pydantic-core instead of
+# dispatching model_validate per row
+_MSG_LIST_ADAPTER = TypeAdapter(list[MessageResponse])
+
+# Rendered search pages, so identical searches (page flips, retried
+# requests) skip the query and serialization. Keys carry the search version
+# stamp, which imports and conversation changes bump in the worker that made
+# them; other workers may serve the old page until the TTL runs out.
+_search_page_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+def render_json(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes.
+
+    Returning a Response skips FastAPI's second validation and
+    serialization pass over the response_model.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+def collect_media_keys(messages: list[Message]) -> list[str]:
+    """Collect every media and thumbnail key referenced by a page of messages."""
+    keys = []
+    for message in messages:
+        for media in message.media_files:
+            keys.append(media.storage_key)
+            if media.thumbnail_key:
+                keys.append(media.thumbnail_key)
+    return keys
+
+
+def enrich_message_response(message: Message, urls: dict[str, str]) -> MessageResponse:
+    """Enrich message with presigned media URLs."""
+    return _apply_enrichment(MessageResponse.model_validate(message), urls)
+
+
+def enrich_message_responses(messages: list[Message], urls: dict[str, str]) -> list[MessageResponse]:
+    """Enrich a page of messages, validating them in a single pass.
+
+    Pass an empty urls dict to leave the media URLs unset.
+    """
+    responses = _MSG_LIST_ADAPTER.validate_python(messages, from_attributes=True)
+    return [_apply_enrichment(response, urls) for response in responses]
+
+
+def _apply_enrichment(response: MessageResponse, urls: dict[str, str]) -> MessageResponse:
+    # Add media URLs
+    for media in response.media_files:
+        media.url = urls.get(media.storage_key)
+        if media.thumbnail_key:
+            media.thumbnail_url = urls.get(media.thumbnail_key)
+
+    return response
+
+
+async def render_message_search(
+    db: AsyncSession,
+    query: str,
+    conversation_id: Optional[int],
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+) -> Response:
+    """Run a message search and render the MessageListResponse JSON.
+
+    Repeated identical searches are served from a short-lived cache of the
+    serialized page.
+    """
+    key = (search_version(conversation_id), query, conversation_id, page, per_page, cursor)
+    content = _search_page_cache.get(key)
+    if content is None:
+        results = await SearchService(db).search_messages(
+            query=query,
+            conversation_id=conversation_id,
+            page=page,
+            per_page=per_page,
+            cursor=decode_cursor(cursor) if cursor else None,
+        )
+        content = MessageListResponse(
+            items=enrich_message_responses(results["items"], {}),
+            total=results["total"],
+            page=results["page"],
+            per_page=results["per_page"],
+            pages=results["pages"],
+            has_more=results["has_more"],
+            next_cursor=encode_cursor(results["items"][-1]) if results["has_more"] else None,
+        ).model_dump_json()
+        _search_page_cache[key] = content
+
+    return Response(content=content, media_type="application/json")
@@ -3,9 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from ..database import get_db
-from ..schemas import MessageResponse, MessageListResponse
-from ..services.search import SearchService
-from ..services.storage import StorageService
+from ..schemas import MessageListResponse
+from .responses import render_message_search
 
 router = APIRouter()
 
@@ -16,31 +15,12 @@ async def search_messages(
     conversation_id: Optional[int] = None,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Search messages using full-text search."""
-    search_service = SearchService(db)
-    results = await search_service.search_messages(
-        query=q,
-        conversation_id=conversation_id,
-        page=page,
-        per_page=per_page,
-    )
+    """Search messages using full-text search.
 
-    # Enrich with participant colors
-    storage = StorageService()
-    enriched = []
-    for message in results["items"]:
-        response = MessageResponse.model_validate(message)
-        if message.participant:
-            response.participant_color = message.participant.color
-        enriched.append(response)
-
-    return MessageListResponse(
-        items=enriched,
-        total=results["total"],
-        page=results["page"],
-        per_page=results["per_page"],
-        pages=results["pages"],
-        has_more=results["page"] < results["pages"],
-    )
+    Pass the previous response's next_cursor as cursor to seek to the next
+    page instead of using page offsets.
+    """
+    return await render_message_search(db, q, conversation_id, page, per_page, cursor)
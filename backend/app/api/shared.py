@@ -1,26 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import selectinload, raiseload
+from typing import Optional
 
 from ..database import get_db
 from ..models import Conversation, Message
-from ..schemas import ConversationResponse, MessageResponse, MessageListResponse
-from ..services.storage import StorageService
+from ..schemas import ConversationResponse, MessageListResponse
+from ..services.storage import StorageService, get_storage
+from .messages import MESSAGE_STMT
+from .pagination import decode_cursor, encode_cursor, page_count, split_page
+from .responses import collect_media_keys, enrich_message_responses, render_json, render_message_search
 
 router = APIRouter()
 
+# The share token is checked against the database on every request, so a
+# revoked or rotated link stops working at once in every worker.
 
-async def get_shared_conversation(token: str, db: AsyncSession) -> Conversation:
-    """Get a conversation by share token."""
+
+async def get_shared_conversation(token: str, db: AsyncSession) -> ConversationResponse:
+    """Get a conversation by share token (share token itself is stripped)."""
     stmt = (
         select(Conversation)
-        .options(selectinload(Conversation.participants))
+        .options(selectinload(Conversation.participants), raiseload("*"))
         .where(Conversation.share_token == token)
     )
     result = await db.execute(stmt)
     conversation = result.scalar_one_or_none()
 
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Shared conversation not found")
+
+    # Don't expose the share token in responses
+    response = ConversationResponse.model_validate(conversation)
+    response.share_token = None
+    return response
+
+
+async def resolve_share_token(token: str, db: AsyncSession) -> Row:
+    """Look up the (id, message_count) of the conversation a share token opens."""
+    stmt = (
+        select(Conversation.id, Conversation.message_count)
+        .where(Conversation.share_token == token)
+    )
+    conversation = (await db.execute(stmt)).one_or_none()
+
     if not conversation:
         raise HTTPException(status_code=404, detail="Shared conversation not found")
 
@@ -33,13 +58,7 @@ async def get_shared_conversation_info(
     db: AsyncSession = Depends(get_db),
 ):
     """Get shared conversation info."""
-    conversation = await get_shared_conversation(token, db)
-
-    # Don't expose the share token in response
-    response = ConversationResponse.model_validate(conversation)
-    response.share_token = None
-
-    return response
+    return await get_shared_conversation(token, db)
 
 
 @router.get("/{token}/messages", response_model=MessageListResponse)
@@ -47,57 +66,45 @@ async def get_shared_messages(
     token: str,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
+    storage: StorageService = Depends(get_storage),
 ):
-    """Get messages from a shared conversation."""
-    conversation = await get_shared_conversation(token, db)
+    """Get messages from a shared conversation (page or cursor based).
 
-    from sqlalchemy import func
+    total always counts the whole conversation.
+    """
+    conversation = await resolve_share_token(token, db)
 
-    offset = (page - 1) * per_page
+    offset = 0 if cursor else (page - 1) * per_page
 
-    # Count total
-    count_stmt = select(func.count()).select_from(Message).where(Message.conversation_id == conversation.id)
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+    stmt = MESSAGE_STMT.where(Message.conversation_id == conversation.id)
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Message.timestamp, Message.id) < tuple_(cursor_ts, cursor_id))
 
     # Get messages - newest first (DESC)
-    stmt = (
-        select(Message)
-        .options(
-            selectinload(Message.participant),
-            selectinload(Message.media_files),
-        )
-        .where(Message.conversation_id == conversation.id)
-        .order_by(Message.timestamp.desc())
-        .offset(offset)
-        .limit(per_page)
-    )
+    # One extra row tells whether another page follows
+    stmt = stmt.order_by(Message.timestamp.desc(), Message.id.desc()).offset(offset).limit(per_page + 1)
 
     result = await db.execute(stmt)
-    messages = result.scalars().all()
+    messages, has_more = split_page(result.scalars().all(), per_page)
+    # The conversation's stored message_count is the total
+    total = conversation.message_count
 
     # Enrich responses
-    storage = StorageService()
-    enriched = []
-    for message in messages:
-        response = MessageResponse.model_validate(message)
-        if message.participant:
-            response.participant_color = message.participant.color
-        for media in response.media_files:
-            media.url = storage.get_presigned_url(media.storage_key)
-        enriched.append(response)
-
-    pages = (total + per_page - 1) // per_page if total > 0 else 0
-
-    return MessageListResponse(
+    urls = storage.presign_many(collect_media_keys(messages))
+    enriched = enrich_message_responses(messages, urls)
+
+    return render_json(MessageListResponse(
         items=enriched,
         total=total,
         page=page,
         per_page=per_page,
-        pages=pages,
-        has_more=page < pages,
-    )
+        pages=page_count(total, per_page),
+        has_more=has_more,
+        next_cursor=encode_cursor(messages[-1]) if has_more else None,
+    ))
 
 
 @router.get("/{token}/search", response_model=MessageListResponse)
@@ -106,35 +113,10 @@ async def search_shared_messages(
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Search messages in a shared conversation."""
-    conversation = await get_shared_conversation(token, db)
-
-    from ..services.search import SearchService
+    """Search messages in a shared conversation; cursor works as in /api/search."""
+    conversation = await resolve_share_token(token, db)
 
-    search_service = SearchService(db)
-    results = await search_service.search_messages(
-        query=q,
-        conversation_id=conversation.id,
-        page=page,
-        per_page=per_page,
-    )
-
-    # Enrich responses
-    storage = StorageService()
-    enriched = []
-    for message in results["items"]:
-        response = MessageResponse.model_validate(message)
-        if message.participant:
-            response.participant_color = message.participant.color
-        enriched.append(response)
-
-    return MessageListResponse(
-        items=enriched,
-        total=results["total"],
-        page=results["page"],
-        per_page=results["per_page"],
-        pages=results["pages"],
-        has_more=results["page"] < results["pages"],
-    )
+    return await render_message_search(db, q, conversation.id, page, per_page, cursor)
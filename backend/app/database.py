@@ -1,15 +1,31 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
 from .config import get_settings
 
 settings = get_settings()
 
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
+    echo=settings.db_echo,
+    query_cache_size=2048,
+    # Larger pages for executemany INSERTs (bulk message import); still capped
+    # by the Postgres bind parameter limit
+    insertmanyvalues_page_size=10000,
+    poolclass=AsyncAdaptedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    connect_args={
+        # asyncpg's own per-connection statement cache
+        "statement_cache_size": settings.db_statement_cache_size,
+        # SQLAlchemy's prepared statement cache in the asyncpg adapter
+        "prepared_statement_cache_size": 256,
+    },
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -33,7 +49,12 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def init_db():
-    """Create all tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def get_estimated_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner's row estimate for a table, or None if it has never been analyzed."""
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
@@ -4,7 +4,7 @@ from contextlib import asynccontextmanager
 import logging
 
 from .config import get_settings
-from .database import init_db
+from .services.analytics import shutdown_calendar_pool
 from .api import api_router
 
 settings = get_settings()
@@ -22,14 +22,10 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     logger.info("Starting up...")
 
-    # Initialize database tables
-    await init_db()
-    logger.info("Database initialized")
-
     # Ensure MinIO bucket exists
     try:
-        from .services.storage import StorageService
-        StorageService()  # This will create the bucket if it doesn't exist
+        from .services.storage import get_storage
+        get_storage()  # This will create the bucket if it doesn't exist
         logger.info("Storage initialized")
     except Exception as e:
         logger.warning(f"Could not initialize storage: {e}")
@@ -37,6 +33,7 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Shutting down...")
+    shutdown_calendar_pool()
 
 
 app = FastAPI(
@@ -84,8 +81,8 @@ async def health():
 
     # Check storage
     try:
-        from .services.storage import StorageService
-        storage = StorageService()
+        from .services.storage import get_storage
+        storage = get_storage()
         storage.client.bucket_exists(settings.minio_bucket)
         health_status["storage"] = "ok"
     except Exception as e:
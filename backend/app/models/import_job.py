@@ -1,16 +1,20 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Enum, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 
+IMPORT_JOB_STATUSES = ("pending", "uploading", "processing", "completed", "failed")
+
+
 class ImportJob(Base):
     __tablename__ = "import_jobs"
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=True)
-    status = Column(String(50), default="pending")  # pending, uploading, processing, completed, failed
+    status = Column(Enum(*IMPORT_JOB_STATUSES, name="import_job_status"), default="pending", nullable=False)
     filename = Column(String(255), nullable=True)
-    file_size = Column(Integer, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
 
     # Progress tracking
     total_chunks = Column(Integer, default=0)
@@ -25,10 +29,19 @@ class ImportJob(Base):
 
     # Storage
     temp_storage_key = Column(String(512), nullable=True)  # Temporary storage in MinIO
+    # Chunk number -> size in bytes of every chunk stored so far
+    chunk_sizes = Column(JSONB, nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by the import_jobs_touch_updated_at trigger on status changes
+    # only, so progress updates don't rewrite it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     conversation = relationship("Conversation", back_populates="import_jobs")
+
+    __table_args__ = (
+        # Newest-first job listing
+        Index("ix_import_jobs_created_at", created_at.desc()),
+    )
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, Computed, func
 from sqlalchemy.dialects.postgresql import TSVECTOR
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from ..database import Base
 
 
@@ -15,7 +15,13 @@ class Message(Base):
     message_type = Column(String(50), default="text")  # text, image, video, audio, document, sticker, system
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
     has_media = Column(Boolean, default=False)
-    search_vector = Column(TSVECTOR, nullable=True)
+    # Copied from the sender's participant at import so reads don't need a join
+    participant_color = Column(String(7), nullable=True)
+    # Maintained by Postgres from content; never written by the app, and only
+    # loaded when explicitly asked for
+    search_vector = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True))
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -25,5 +31,14 @@ class Message(Base):
 
     __table_args__ = (
         Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
-        Index("ix_messages_conversation_timestamp", "conversation_id", "timestamp"),
+        # Matches the (timestamp DESC, id DESC) keyset used by message pagination.
+        # The included columns let analytics read a whole conversation with an
+        # index-only scan.
+        Index(
+            "ix_messages_conversation_timestamp_covering",
+            "conversation_id",
+            timestamp.desc(),
+            id.desc(),
+            postgresql_include=["sender_name", "participant_id", "message_type"],
+        ),
     )
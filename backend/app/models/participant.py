@@ -1,10 +1,12 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship
+from typing import Iterator
+import itertools
 from ..database import Base
 
 
 # Predefined colors for participants
-PARTICIPANT_COLORS = [
+PARTICIPANT_COLORS = (
     "#25D366",  # WhatsApp green
     "#34B7F1",  # WhatsApp blue
     "#9C27B0",  # Purple
@@ -17,7 +19,8 @@ PARTICIPANT_COLORS = [
     "#795548",  # Brown
     "#607D8B",  # Blue grey
     "#8BC34A",  # Light green
-]
+)
+_PARTICIPANT_COLOR_COUNT = len(PARTICIPANT_COLORS)
 
 
 class Participant(Base):
@@ -38,4 +41,9 @@ class Participant(Base):
     @staticmethod
     def get_color(index: int) -> str:
         """Get a color for a participant based on their index."""
-        return PARTICIPANT_COLORS[index % len(PARTICIPANT_COLORS)]
+        return PARTICIPANT_COLORS[index % _PARTICIPANT_COLOR_COUNT]
+
+    @staticmethod
+    def color_cycle() -> Iterator[str]:
+        """Yield participant colors in assignment order, wrapping around."""
+        return itertools.cycle(PARTICIPANT_COLORS)
@@ -2,9 +2,10 @@ from .conversation import (
     ConversationCreate,
     ConversationUpdate,
     ConversationResponse,
+    ConversationListItem,
     ConversationListResponse,
 )
-from .message import MessageResponse, MessageListResponse
+from .message import MessageResponse, MessageListResponse, MessageContextResponse
 from .participant import ParticipantResponse
 from .media import MediaResponse
 from .import_job import (
@@ -19,9 +20,11 @@ __all__ = [
     "ConversationCreate",
     "ConversationUpdate",
     "ConversationResponse",
+    "ConversationListItem",
     "ConversationListResponse",
     "MessageResponse",
     "MessageListResponse",
+    "MessageContextResponse",
     "ParticipantResponse",
     "MediaResponse",
     "ImportJobCreate",
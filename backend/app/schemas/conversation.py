@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional
 from .participant import ParticipantResponse
@@ -26,12 +26,24 @@ class ConversationResponse(ConversationBase):
     created_at: datetime
     participants: list[ParticipantResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ConversationListItem(ConversationBase):
+    """A conversation in the list view, with a participant count instead of participants."""
+    id: int
+    share_token: Optional[str] = None
+    message_count: int
+    first_message_at: Optional[datetime] = None
+    last_message_at: Optional[datetime] = None
+    created_at: datetime
+    participant_count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ConversationListResponse(BaseModel):
-    items: list[ConversationResponse]
+    items: list[ConversationListItem]
     total: int
     page: int
     per_page: int
@@ -1,5 +1,4 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 
@@ -18,5 +17,4 @@ class MediaResponse(MediaBase):
     url: Optional[str] = None  # Generated presigned URL
     thumbnail_url: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional
 from .media import MediaResponse
@@ -19,8 +19,7 @@ class MessageResponse(MessageBase):
     media_files: list[MediaResponse] = []
     participant_color: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class MessageListResponse(BaseModel):
@@ -30,3 +29,10 @@ class MessageListResponse(BaseModel):
     per_page: int
     pages: int
     has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class MessageContextResponse(BaseModel):
+    before: list[MessageResponse]
+    target: MessageResponse
+    after: list[MessageResponse]
@@ -3,26 +3,34 @@ Analytics service for generating chat visualizations.
 Adapted from whatsapp-heatmap project, optimized for long-running chats (5+ years).
 """
 
+import asyncio
+import contextlib
 import io
 import logging
-from datetime import datetime
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
 from typing import Optional
-from collections import defaultdict
 
 import pandas as pd
 import numpy as np
+import orjson
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import seaborn as sns
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 import calplot
 
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import Message, Participant, Conversation
-from .storage import StorageService
+from ..models import Message, Participant
+from .storage import get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -32,44 +40,450 @@ FONT_SIZE_TITLE = 14
 FONT_SIZE_LABEL = 11
 FONT_SIZE_TICK = 9
 
+# Status of the latest background generation per conversation. It is kept
+# in storage next to the cached result, so every worker sees the same job.
+# A running generation refreshes its status every GENERATION_HEARTBEAT; a
+# queued or running status older than GENERATION_STALE_AFTER belonged to a
+# worker that went away before finishing and is reported as failed.
+GENERATION_HEARTBEAT = timedelta(minutes=1)
+GENERATION_STALE_AFTER = timedelta(minutes=30)
+
+# calplot draws through pyplot, whose global figure state is not thread-safe,
+# so calendars render in worker processes, each with its own pyplot. The
+# pool is created on first use, spawning rather than forking from the
+# threaded server, and shut down with the app.
+_calendar_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_calendar_pool() -> ProcessPoolExecutor:
+    """The calendar rendering pool, created on first use."""
+    global _calendar_pool
+    if _calendar_pool is None:
+        _calendar_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _calendar_pool
+
+
+def shutdown_calendar_pool() -> None:
+    """Stop the calendar worker processes, if any were started."""
+    global _calendar_pool
+    if _calendar_pool is not None:
+        _calendar_pool.shutdown(cancel_futures=True)
+        _calendar_pool = None
+
+# PostgreSQL binary COPY framing for (timestamptz, int4) rows: a field count,
+# then each field as a length and its big-endian value. timestamptz values
+# are microseconds since 2000-01-01 UTC.
+_COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+_COPY_ROW = np.dtype([
+    ('fields', '>i2'),
+    ('timestamp_len', '>i4'),
+    ('timestamp', '>i8'),
+    ('participant_len', '>i4'),
+    ('participant_id', '>i4'),
+])
+_PG_EPOCH_US = 946_684_800_000_000
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+@dataclass
+class MessageData:
+    """A conversation's messages as parallel arrays, one entry per message.
+
+    Calendar fields are derived once, in UTC, as small integers so the chart
+    builders group and count on integer keys instead of datetime accessors.
+    Aggregates several charts share are computed on first use and kept, so
+    callers must not modify what these methods return.
+    """
+    timestamp: np.ndarray    # naive UTC datetime64, ascending
+    sender: np.ndarray       # codes into senders
+    senders: list[str]       # sender names, in order of first appearance
+    hour: np.ndarray         # 0-23
+    day_of_week: np.ndarray  # 0 = Monday
+    day: np.ndarray          # days since 1970-01-01
+    year: np.ndarray
+    month: np.ndarray        # months since 1970-01
+    quarter: np.ndarray      # quarters since 1970Q1
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def from_copy(cls, data: bytes, names: dict[int, str]) -> "MessageData":
+        """Build from a binary COPY of (timestamp, participant id) rows.
+
+        Every row has the same width, so the columns are read straight out
+        of the buffer with a structured dtype. names maps participant ids to
+        sender names.
+        """
+        if data[:len(_COPY_SIGNATURE)] != _COPY_SIGNATURE:
+            raise ValueError("Unexpected COPY output")
+        # Signature, flags field, then a header extension of the given length
+        header = len(_COPY_SIGNATURE) + 8 + int.from_bytes(data[15:19], 'big')
+        # Rows end at the two-byte trailer
+        count = (len(data) - header - 2) // _COPY_ROW.itemsize
+        rows = np.frombuffer(data, dtype=_COPY_ROW, offset=header, count=count)
+        if ((rows['timestamp_len'] != 8) | (rows['participant_len'] != 4)).any():
+            raise ValueError("Unexpected NULL in COPY output")
+
+        ts = (rows['timestamp'].astype(np.int64) + _PG_EPOCH_US).astype('datetime64[us]')
+        # Number senders in order of first appearance
+        sender, ids = pd.factorize(rows['participant_id'].astype(np.int32))
+        return cls.from_arrays(ts, sender, [names.get(int(pid), 'Unknown') for pid in ids])
+
+    @classmethod
+    def from_arrays(cls, ts: np.ndarray, sender: np.ndarray, senders: list[str]) -> "MessageData":
+        """Build from naive UTC datetime64 timestamps and sender codes."""
+        seconds = ts.astype('datetime64[s]').astype(np.int64)
+        day = seconds // 86400
+        month = ts.astype('datetime64[M]').astype(np.int64)
+        return cls(
+            timestamp=ts,
+            sender=sender,
+            senders=senders,
+            hour=(seconds // 3600 % 24).astype(np.int8),
+            # 1970-01-01 was a Thursday
+            day_of_week=((day + 3) % 7).astype(np.int8),
+            day=day.astype(np.int32),
+            year=(month // 12 + 1970).astype(np.int16),
+            month=month.astype(np.int32),
+            quarter=(month // 3).astype(np.int32),
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the arrays as an .npz archive."""
+        buffer = io.BytesIO()
+        arrays = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        arrays['senders'] = np.asarray(self.senders, dtype=str)
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MessageData":
+        """Load arrays written by to_bytes."""
+        with np.load(io.BytesIO(data)) as archive:
+            arrays = {f.name: archive[f.name] for f in fields(cls) if f.init}
+        arrays['senders'] = arrays['senders'].tolist()
+        return cls(**arrays)
+
+    @property
+    def days_span(self) -> int:
+        """Whole days between the first and last message."""
+        return int((self.timestamp[-1] - self.timestamp[0]) // np.timedelta64(1, 'D'))
+
+    def sender_counts(self) -> pd.Series:
+        """Messages per sender name, most active first."""
+        counts = self._cache.get('sender_counts')
+        if counts is None:
+            totals = np.bincount(self.sender, minlength=len(self.senders))
+            # Stable, so ties keep first-appearance order as value_counts() did
+            order = np.argsort(-totals, kind='stable')
+            counts = pd.Series(totals[order], index=[self.senders[code] for code in order])
+            self._cache['sender_counts'] = counts
+        return counts
+
+    def sender_codes(self, person: str) -> list[int]:
+        """Codes of the senders matching person case-insensitively."""
+        name = person.lower()
+        return [code for code, sender in enumerate(self.senders) if sender.lower() == name]
+
+    def sender_mask(self, person: str) -> np.ndarray:
+        """Mask of messages sent by person, matched case-insensitively."""
+        name = person.lower()
+        mask = self._cache.get(('mask', name))
+        if mask is None:
+            codes = self.sender_codes(person)
+            if len(codes) == 1:
+                mask = self.sender == codes[0]
+            else:
+                mask = np.isin(self.sender, codes)
+            self._cache[('mask', name)] = mask
+        return mask
+
+    def daily_counts(self) -> pd.Series:
+        """Messages per calendar day that has any, indexed by date."""
+        counts = self._cache.get('daily_counts')
+        if counts is None:
+            first = int(self.day[0])
+            day_counts = np.bincount(self.day - first)
+            days = np.flatnonzero(day_counts)
+            counts = pd.Series(day_counts[days], index=pd.to_datetime(days + first, unit='D'))
+            self._cache['daily_counts'] = counts
+        return counts
+
+    def sender_day_hour_grid(self) -> np.ndarray:
+        """Message counts as a (senders x 7 x 24) array of sender code, day of
+        week (Monday first) and hour, built in a single bincount pass."""
+        grid = self._cache.get('day_hour')
+        if grid is None:
+            key = (self.sender * 7 + self.day_of_week) * 24 + self.hour
+            grid = np.bincount(key, minlength=len(self.senders) * 7 * 24).reshape(-1, 7, 24)
+            self._cache['day_hour'] = grid
+        return grid
+
+    def period_sender_grid(self, period_col: str) -> tuple[np.ndarray, np.ndarray]:
+        """Message counts per month or quarter and sender code.
+
+        Returns the consecutive period numbers from first to last message and
+        a (periods x senders) count array, built in a single bincount pass.
+        """
+        grid = self._cache.get(('periods', period_col))
+        if grid is None:
+            period = getattr(self, period_col)
+            first = int(period[0])
+            n_periods = int(period[-1]) - first + 1
+            n_senders = len(self.senders)
+            key = (period.astype(np.intp) - first) * n_senders + self.sender
+            counts = np.bincount(key, minlength=n_periods * n_senders).reshape(n_periods, n_senders)
+            grid = (np.arange(first, first + n_periods), counts)
+            self._cache[('periods', period_col)] = grid
+        return grid
+
+
+def _period_labels(period_col: str, periods) -> list[str]:
+    """Labels for month or quarter numbers, formatted like pandas Periods."""
+    if period_col == 'quarter':
+        return [f"{1970 + q // 4}Q{q % 4 + 1}" for q in periods]
+    return [f"{1970 + m // 12}-{m % 12 + 1:02d}" for m in periods]
+
+
+def _period_sender_counts(data: MessageData, period_col: str, labels: list[Optional[str]]) -> pd.DataFrame:
+    """Message counts per month or quarter (rows) and sender label (columns).
+
+    labels maps each sender code to the column it counts towards, or None to
+    leave that sender out. Columns come out in alphabetical order.
+    """
+    periods, grid = data.period_sender_grid(period_col)
+    columns = sorted({label for label in labels if label is not None})
+    sender_labels = np.array(labels, dtype=object)
+    counts = np.column_stack([grid[:, sender_labels == label].sum(axis=1) for label in columns])
+
+    # Like a groupby: only periods and senders with messages are kept
+    rows = counts.any(axis=1)
+    cols = counts.any(axis=0)
+    return pd.DataFrame(
+        counts[rows][:, cols],
+        index=pd.Index(_period_labels(period_col, periods[rows]), name=period_col),
+        columns=pd.Index([label for label, keep in zip(columns, cols) if keep], name='sender'),
+    )
+
+
+def _fig_to_png(fig) -> bytes:
+    """Convert matplotlib figure to PNG bytes.
+
+    Uses the fastest zlib level: encoding dominates a chart's render time,
+    and the somewhat larger files cost little in storage.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight',
+                facecolor='white', edgecolor='none',
+                pil_kwargs={'compress_level': 1, 'optimize': False})
+    buf.seek(0)
+    return buf.read()
+
+
+def _render_calendar(days: np.ndarray, counts: np.ndarray, kwargs: dict) -> bytes:
+    """Render a calendar heatmap of message counts per day to PNG bytes.
+
+    Runs in a calendar worker process; takes plain arrays so only those are
+    pickled across.
+    """
+    daily_counts = pd.Series(counts, index=pd.to_datetime(days, unit='D'))
+    fig, ax = calplot.calplot(daily_counts, cmap='YlGn', colorbar=True, **kwargs)
+    try:
+        return _fig_to_png(fig)
+    finally:
+        plt.close(fig)
+
+
+def _day_hour_grid(data: MessageData, person: Optional[str] = None) -> np.ndarray:
+    """Message counts as a 7 x 24 array of day of week (Monday first) by hour.
+
+    Counts every message, or only person's when given.
+    """
+    grid = data.sender_day_hour_grid()
+    if person is not None:
+        grid = grid[data.sender_codes(person)]
+    return grid.sum(axis=0)
+
+
+def _day_hour_counts(data: MessageData, person: Optional[str] = None) -> pd.DataFrame:
+    """Message counts by day of week (rows, Monday first) and hour (columns).
+
+    Like a pivot table on day name and hour: only hours that occur become
+    columns, and days without messages are NaN rows.
+    """
+    grid = _day_hour_grid(data, person)
+    hours = np.flatnonzero(grid.any(axis=0))
+    table = pd.DataFrame(
+        grid[:, hours],
+        index=pd.Index(DAY_NAMES, name='day_name'),
+        columns=pd.Index(hours, name='hour'),
+    )
+    return table.where(pd.Series(grid.any(axis=1), index=table.index), axis=0)
+
+
+def _generation_status_key(conversation_id: int) -> str:
+    return f"conversations/{conversation_id}/analytics/status.json"
+
+
+async def get_generation_status(conversation_id: int) -> Optional[dict]:
+    """Get the status of the latest analytics generation for a conversation."""
+    data = await asyncio.to_thread(get_storage().download_bytes, _generation_status_key(conversation_id))
+    if not data:
+        return None
+
+    job = orjson.loads(data)
+    updated_at = datetime.fromisoformat(job.pop("updated_at"))
+    if job["status"] in ("queued", "running") and datetime.utcnow() - updated_at > GENERATION_STALE_AFTER:
+        job["status"] = "failed"
+        job["error"] = "Analytics generation was interrupted"
+    return job
+
+
+async def set_generation_status(
+    conversation_id: int,
+    status: str,
+    run_id: str,
+    error: Optional[str] = None,
+) -> dict:
+    """Record the status of an analytics generation run."""
+    job = {"conversation_id": conversation_id, "status": status, "run_id": run_id, "error": error}
+    data = orjson.dumps({**job, "updated_at": datetime.utcnow().isoformat()})
+    await asyncio.to_thread(
+        get_storage().upload_bytes, _generation_status_key(conversation_id), data, "application/json"
+    )
+    return job
+
+
+async def _is_current_run(conversation_id: int, run_id: str) -> bool:
+    """Whether run_id is still the latest generation of the conversation.
+
+    Checking for an in-flight run and queueing a new one are not atomic, so
+    two requests can both queue a run; the later one wins.
+    """
+    job = await get_generation_status(conversation_id)
+    return job is not None and job.get("run_id") == run_id
+
+
+async def generate_analytics_in_background(
+    conversation_id: int,
+    run_id: str,
+    person1: Optional[str] = None,
+    person2: Optional[str] = None,
+) -> None:
+    """Generate analytics outside the request that queued them.
+
+    The status is refreshed while the run is in progress, and the run stops
+    once a later run has replaced it, so only the latest run saves results
+    and reports an outcome.
+    """
+    # Create new session for background task
+    from ..database import AsyncSessionLocal
+
+    if not await _is_current_run(conversation_id, run_id):
+        return
+    await set_generation_status(conversation_id, "running", run_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            generation = asyncio.create_task(AnalyticsService(db).generate_analytics(
+                conversation_id,
+                person1=person1,
+                person2=person2,
+            ))
+            heartbeat = GENERATION_HEARTBEAT.total_seconds()
+            while not (await asyncio.wait({generation}, timeout=heartbeat))[0]:
+                if not await _is_current_run(conversation_id, run_id):
+                    generation.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await generation
+                    logger.info(f"Analytics generation for conversation {conversation_id} was superseded")
+                    return
+                await set_generation_status(conversation_id, "running", run_id)
+            generation.result()
+    except Exception as e:
+        logger.exception(f"Analytics generation failed for conversation {conversation_id}")
+        if await _is_current_run(conversation_id, run_id):
+            await set_generation_status(conversation_id, "failed", run_id, str(e))
+    else:
+        if await _is_current_run(conversation_id, run_id):
+            await set_generation_status(conversation_id, "completed", run_id)
+
+
+# Rows for MessageData.from_copy; same filters as the count in get_message_data.
+# Every non-system message has a participant, whose name is its sender name.
+_MESSAGE_DATA_QUERY = """
+    SELECT timestamp, coalesce(participant_id, 0)
+    FROM messages
+    WHERE conversation_id = $1 AND message_type <> 'system'
+    ORDER BY timestamp
+"""
+
 
 class AnalyticsService:
     """Generate analytics visualizations for conversations."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.storage = StorageService()
+        self.storage = get_storage()
 
-    async def get_message_data(self, conversation_id: int) -> pd.DataFrame:
-        """Fetch messages and convert to DataFrame for analysis."""
-        stmt = (
-            select(
-                Message.timestamp,
-                Message.sender_name,
-                Message.participant_id,
-            )
-            .where(Message.conversation_id == conversation_id)
-            .where(Message.message_type != 'system')
-            .order_by(Message.timestamp)
-        )
+    async def get_message_data(self, conversation_id: int) -> MessageData:
+        """Fetch messages as parallel arrays for analysis.
 
-        result = await self.db.execute(stmt)
-        rows = result.fetchall()
+        The arrays are cached in storage and reused while the conversation's
+        message count is unchanged.
+        """
+        filters = (
+            Message.conversation_id == conversation_id,
+            Message.message_type != 'system',
+        )
 
-        if not rows:
-            return pd.DataFrame()
+        count = await self.db.scalar(select(func.count()).where(*filters))
+        cached = await asyncio.to_thread(self._load_message_data, conversation_id)
+        if cached is not None and len(cached) == count:
+            return cached
 
-        df = pd.DataFrame(rows, columns=['datetime', 'sender', 'participant_id'])
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df['date'] = df['datetime'].dt.date
-        df['hour'] = df['datetime'].dt.hour
-        df['day_of_week'] = df['datetime'].dt.dayofweek
-        df['day_name'] = df['datetime'].dt.day_name()
-        df['month'] = df['datetime'].dt.to_period('M')
-        df['year'] = df['datetime'].dt.year
-        df['quarter'] = df['datetime'].dt.to_period('Q')
+        result = await self.db.execute(
+            select(Participant.id, Participant.name)
+            .where(Participant.conversation_id == conversation_id)
+        )
+        names = dict(result.all())
+
+        # COPY the rows out in binary on the asyncpg connection, so they are
+        # read into arrays directly instead of becoming one Row per message
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        buffer = io.BytesIO()
+        await raw.driver_connection.copy_from_query(
+            _MESSAGE_DATA_QUERY, conversation_id, output=buffer, format='binary'
+        )
+        data = await asyncio.to_thread(MessageData.from_copy, buffer.getvalue(), names)
+        if len(data):
+            await asyncio.to_thread(self._save_message_data, conversation_id, data)
+        return data
+
+    def _save_message_data(self, conversation_id: int, data: MessageData) -> None:
+        """Save message arrays to MinIO for reuse by later runs."""
+        key = f"conversations/{conversation_id}/analytics/messages.npz"
+        try:
+            self.storage.upload_bytes(key, data.to_bytes(), "application/octet-stream")
+        except Exception as e:
+            logger.warning(f"Could not cache message data for conversation {conversation_id}: {e}")
 
-        return df
+    def _load_message_data(self, conversation_id: int) -> Optional[MessageData]:
+        """Get cached message arrays if they exist."""
+        key = f"conversations/{conversation_id}/analytics/messages.npz"
+        try:
+            data = self.storage.download_bytes(key)
+            if data:
+                return MessageData.from_bytes(data)
+        except Exception as e:
+            logger.debug(f"No cached message data for conversation {conversation_id}: {e}")
+        return None
 
     async def get_participants(self, conversation_id: int) -> list[dict]:
         """Get participants with their colors."""
@@ -97,80 +511,87 @@ class AnalyticsService:
         If person1 and person2 are provided, generates comparison charts.
         Otherwise, generates group-wide analytics.
         """
-        df = await self.get_message_data(conversation_id)
+        data = await self.get_message_data(conversation_id)
 
-        if df.empty:
+        if not len(data):
             raise ValueError("No messages found for analysis")
 
         participants = await self.get_participants(conversation_id)
 
+        return await self._build_analytics(conversation_id, data, participants, person1, person2)
+
+    async def _build_analytics(
+        self,
+        conversation_id: int,
+        data: MessageData,
+        participants: list[dict],
+        person1: Optional[str],
+        person2: Optional[str],
+    ) -> dict:
+        """Render and upload all charts concurrently, then save and return the result.
+
+        Each chart draws on its own Figure, so rendering and uploads run in
+        worker threads side by side instead of blocking the event loop.
+        """
         # Check if we're doing a comparison or group analytics
         do_comparison = bool(person1 and person2)
+        compare1 = person1 if do_comparison else None
+        compare2 = person2 if do_comparison else None
 
-        # Generate all charts
-        charts = {}
         storage_prefix = f"conversations/{conversation_id}/analytics"
 
         # Calculate date range for adaptive sizing
-        years_span = float((df['datetime'].max() - df['datetime'].min()).days / 365)
-
-        # 1. Time heatmap (hour x day of week) - always show overall
-        img_data = self._create_time_heatmap(df, person1 if do_comparison else None,
-                                              person2 if do_comparison else None, participants)
-        key = f"{storage_prefix}/heatmap_time.png"
-        self.storage.upload_bytes(key, img_data, "image/png")
-        charts['time_heatmap'] = self.storage.get_presigned_url(key, expires_hours=24)
-
-        # 2. Calendar heatmap (split by year for long chats)
-        calendar_urls = self._create_calendar_heatmaps(df, storage_prefix, years_span)
-        charts['calendar_heatmaps'] = calendar_urls
+        years_span = float(data.days_span / 365)
+
+        def render(name: str, create, *args) -> Optional[str]:
+            """Render one chart, upload it and return its storage key."""
+            img_data = create(*args)
+            if not img_data:
+                return None
+            return self._upload_chart(f"{storage_prefix}/{name}.png", img_data)
+
+        jobs = {
+            # 1. Time heatmap (hour x day of week) - always show overall
+            'time_heatmap': asyncio.to_thread(
+                render, 'heatmap_time', self._create_time_heatmap, data, compare1, compare2, participants),
+            # 2. Calendar heatmap (split by year for long chats)
+            'calendar_heatmaps': self._create_calendar_heatmaps(data, storage_prefix, years_span),
+        }
 
         # 3. Comparison heatmap (only if comparing two people)
         if do_comparison:
-            img_data = self._create_comparison_heatmap(df, person1, person2, participants)
-            if img_data:
-                key = f"{storage_prefix}/heatmap_comparison.png"
-                self.storage.upload_bytes(key, img_data, "image/png")
-                charts['comparison_heatmap'] = self.storage.get_presigned_url(key, expires_hours=24)
+            jobs['comparison_heatmap'] = asyncio.to_thread(
+                render, 'heatmap_comparison', self._create_comparison_heatmap, data, person1, person2, participants)
 
         # 4. Monthly/Quarterly trend (adaptive based on date range)
-        img_data = self._create_trend_chart(df, person1 if do_comparison else None,
-                                            person2 if do_comparison else None, participants, years_span)
-        key = f"{storage_prefix}/trend.png"
-        self.storage.upload_bytes(key, img_data, "image/png")
-        charts['trend'] = self.storage.get_presigned_url(key, expires_hours=24)
+        jobs['trend'] = asyncio.to_thread(
+            render, 'trend', self._create_trend_chart, data, compare1, compare2, participants, years_span)
 
         # 5. Response time analysis (only for comparison)
         if do_comparison:
-            img_data = self._create_response_time_chart(df, person1, person2, participants)
-            if img_data:
-                key = f"{storage_prefix}/response_time.png"
-                self.storage.upload_bytes(key, img_data, "image/png")
-                charts['response_time'] = self.storage.get_presigned_url(key, expires_hours=24)
+            jobs['response_time'] = asyncio.to_thread(
+                render, 'response_time', self._create_response_time_chart, data, person1, person2, participants)
 
         # 6. Daily activity chart
-        img_data = self._create_daily_activity_chart(df, years_span)
-        key = f"{storage_prefix}/daily_activity.png"
-        self.storage.upload_bytes(key, img_data, "image/png")
-        charts['daily_activity'] = self.storage.get_presigned_url(key, expires_hours=24)
+        jobs['daily_activity'] = asyncio.to_thread(
+            render, 'daily_activity', self._create_daily_activity_chart, data, years_span)
 
         # 7. Top participants chart (for group chats)
-        img_data = self._create_top_participants_chart(df, participants)
-        key = f"{storage_prefix}/top_participants.png"
-        self.storage.upload_bytes(key, img_data, "image/png")
-        charts['top_participants'] = self.storage.get_presigned_url(key, expires_hours=24)
+        jobs['top_participants'] = asyncio.to_thread(
+            render, 'top_participants', self._create_top_participants_chart, data, participants)
 
         # 8. Participation over time (who was most active each period)
-        img_data = self._create_participation_over_time(df, participants, years_span)
-        key = f"{storage_prefix}/participation_over_time.png"
-        self.storage.upload_bytes(key, img_data, "image/png")
-        charts['participation_over_time'] = self.storage.get_presigned_url(key, expires_hours=24)
+        jobs['participation_over_time'] = asyncio.to_thread(
+            render, 'participation_over_time', self._create_participation_over_time, data, participants, years_span)
 
-        # Calculate summary stats
-        summary = self._calculate_summary(df, person1 if do_comparison else None,
-                                          person2 if do_comparison else None, participants)
+        # Calculate summary stats alongside the charts
+        summary, *keys = await asyncio.gather(
+            asyncio.to_thread(self._calculate_summary, data, compare1, compare2, participants),
+            *jobs.values(),
+        )
+        # Charts hold their storage keys until all are signed in one pass
+        charts = {name: key for name, key in zip(jobs, keys) if key is not None}
 
-        # Ensure all values are JSON-serializable (convert numpy types)
         result = {
             "charts": charts,
             "summary": summary,
@@ -178,28 +599,36 @@ class AnalyticsService:
             "generated_at": datetime.utcnow().isoformat(),
             "is_group_chat": len(participants) > 2,
         }
-        result = self._to_native_types(result)
+        result = self._refresh_chart_urls(conversation_id, result)
 
-        # Save result to storage for caching
-        self._save_analytics_result(conversation_id, result)
+        # Save result to storage for caching, and hand back the same JSON the
+        # cache serves
+        data = await asyncio.to_thread(self._save_analytics_result, conversation_id, result)
+        return orjson.loads(data)
 
-        return result
+    def _upload_chart(self, key: str, img_data: bytes) -> str:
+        """Upload a chart PNG and return its key."""
+        self.storage.upload_bytes(key, img_data, "image/png")
+        return key
+
+    def _save_analytics_result(self, conversation_id: int, result: dict) -> bytes:
+        """Save analytics result to MinIO for caching; returns the JSON saved.
 
-    def _save_analytics_result(self, conversation_id: int, result: dict) -> None:
-        """Save analytics result to MinIO for caching."""
-        import json
+        orjson serializes the numpy scalars and arrays the charts and summary
+        produce directly.
+        """
         key = f"conversations/{conversation_id}/analytics/result.json"
-        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        data = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
         self.storage.upload_bytes(key, data, "application/json")
+        return data
 
     def get_cached_analytics(self, conversation_id: int) -> Optional[dict]:
         """Get cached analytics result if it exists."""
-        import json
         key = f"conversations/{conversation_id}/analytics/result.json"
         try:
             data = self.storage.download_bytes(key)
             if data:
-                result = json.loads(data.decode('utf-8'))
+                result = orjson.loads(data)
                 # Refresh presigned URLs (they expire)
                 result = self._refresh_chart_urls(conversation_id, result)
                 return result
@@ -208,10 +637,10 @@ class AnalyticsService:
         return None
 
     def _refresh_chart_urls(self, conversation_id: int, result: dict) -> dict:
-        """Refresh presigned URLs for charts."""
+        """Refresh presigned URLs for charts, signing them all in one pass."""
         storage_prefix = f"conversations/{conversation_id}/analytics"
 
-        # Refresh main chart URLs
+        # Chart name -> stored file
         chart_keys = {
             'time_heatmap': 'heatmap_time.png',
             'trend': 'trend.png',
@@ -222,23 +651,24 @@ class AnalyticsService:
             'response_time': 'response_time.png',
         }
 
-        for chart_name, filename in chart_keys.items():
-            if chart_name in result.get('charts', {}):
-                key = f"{storage_prefix}/{filename}"
-                try:
-                    result['charts'][chart_name] = self.storage.get_presigned_url(key, expires_hours=24)
-                except:
-                    pass
+        charts = result.get('charts', {})
+        main_keys = {
+            chart_name: f"{storage_prefix}/{filename}"
+            for chart_name, filename in chart_keys.items()
+            if chart_name in charts
+        }
+        calendars = charts.get('calendar_heatmaps', [])
+        calendar_keys = [f"{storage_prefix}/calendar_{cal.get('year', 'all')}.png" for cal in calendars]
+
+        urls = self.storage.presign_many([*main_keys.values(), *calendar_keys], expires_hours=24)
+
+        # Refresh main chart URLs
+        for chart_name, key in main_keys.items():
+            charts[chart_name] = urls[key]
 
         # Refresh calendar heatmap URLs
-        if 'calendar_heatmaps' in result.get('charts', {}):
-            for cal in result['charts']['calendar_heatmaps']:
-                year = cal.get('year', 'all')
-                key = f"{storage_prefix}/calendar_{year}.png"
-                try:
-                    cal['url'] = self.storage.get_presigned_url(key, expires_hours=24)
-                except:
-                    pass
+        for cal, key in zip(calendars, calendar_keys):
+            cal['url'] = urls[key]
 
         return result
 
@@ -249,53 +679,23 @@ class AnalyticsService:
                 return p['color']
         return '#128C7E'
 
-    def _to_native_types(self, obj):
-        """Convert numpy/pandas types to Python native types for JSON serialization."""
-        if obj is None:
-            return None
-        if isinstance(obj, dict):
-            return {str(k): self._to_native_types(v) for k, v in obj.items()}
-        if isinstance(obj, (list, tuple)):
-            return [self._to_native_types(item) for item in obj]
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if isinstance(obj, np.ndarray):
-            return [self._to_native_types(item) for item in obj.tolist()]
-        if isinstance(obj, (pd.Timestamp, datetime)):
-            return obj.isoformat()
-        if isinstance(obj, pd.Period):
-            return str(obj)
-        # Check for any remaining numpy generic type
-        if hasattr(obj, 'item'):
-            return obj.item()
-        return obj
-
     def _create_time_heatmap(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         person1: Optional[str],
         person2: Optional[str],
         participants: list[dict],
     ) -> bytes:
         """Create hour x day of week heatmap."""
         num_plots = 1 + (1 if person1 else 0) + (1 if person2 else 0)
-        fig, axes = plt.subplots(1, num_plots, figsize=(6 * num_plots, 5))
+        fig = Figure(figsize=(6 * num_plots, 5))
+        axes = fig.subplots(1, num_plots)
 
         if num_plots == 1:
             axes = [axes]
 
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
         # Combined heatmap
-        pivot = df.pivot_table(
-            index='day_name', columns='hour', values='datetime',
-            aggfunc='count', fill_value=0
-        )
-        pivot = pivot.reindex(day_order)
+        pivot = _day_hour_counts(data)
 
         sns.heatmap(pivot, ax=axes[0], cmap='YlOrRd', annot=False,
                     cbar_kws={'label': 'Messages'}, fmt='d')
@@ -308,13 +708,8 @@ class AnalyticsService:
         plot_idx = 1
         for person in [person1, person2]:
             if person and plot_idx < num_plots:
-                person_df = df[df['sender'].str.lower() == person.lower()]
-                if not person_df.empty:
-                    pivot = person_df.pivot_table(
-                        index='day_name', columns='hour', values='datetime',
-                        aggfunc='count', fill_value=0
-                    )
-                    pivot = pivot.reindex(day_order)
+                if data.sender_codes(person):
+                    pivot = _day_hour_counts(data, person)
 
                     color = self._get_participant_color(person, participants)
                     cmap = sns.light_palette(color, as_cmap=True)
@@ -327,110 +722,88 @@ class AnalyticsService:
                     axes[plot_idx].tick_params(labelsize=FONT_SIZE_TICK)
                 plot_idx += 1
 
-        plt.tight_layout()
+        fig.tight_layout()
         return self._fig_to_bytes(fig)
 
-    def _create_calendar_heatmaps(
+    async def _create_calendar_heatmaps(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         storage_prefix: str,
         years_span: float,
     ) -> list[str]:
-        """Create calendar heatmaps, split by year for long chats."""
-        urls = []
-        daily_counts = df.groupby('date').size()
-        daily_counts.index = pd.to_datetime(daily_counts.index)
+        """Create calendar heatmaps, split by year for long chats.
+
+        Calendars render in parallel in the calendar worker processes and
+        upload concurrently.
+        """
+        daily_counts = data.daily_counts()
+        days = daily_counts.index.to_numpy().astype('datetime64[D]').astype(np.int64)
+        counts = daily_counts.to_numpy()
 
-        years = sorted(df['year'].unique())
+        years = sorted(np.unique(data.year))
 
         # For very long chats, generate per-year
+        calendars = []
         if years_span > 3:
+            day_years = daily_counts.index.year
             for year in years:
-                year_data = daily_counts[daily_counts.index.year == year]
-                if len(year_data) < 10:
+                in_year = day_years == year
+                if in_year.sum() < 10:
                     continue
-
-                try:
-                    fig, ax = calplot.calplot(
-                        year_data,
-                        cmap='YlGn',
-                        colorbar=True,
-                        suptitle=f'Message Activity - {year}',
-                        figsize=(12, 3),
-                        yearlabel_kws={'fontsize': FONT_SIZE_TITLE},
-                    )
-
-                    img_data = self._fig_to_bytes(fig)
-                    key = f"{storage_prefix}/calendar_{year}.png"
-                    self.storage.upload_bytes(key, img_data, "image/png")
-                    urls.append({
-                        "year": int(year),  # Convert numpy.int64 to Python int
-                        "url": self.storage.get_presigned_url(key, expires_hours=24)
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to generate calendar for {year}: {e}")
+                calendars.append((int(year), f"calendar_{year}", in_year, {
+                    'suptitle': f'Message Activity - {year}',
+                    'figsize': (12, 3),
+                    'yearlabel_kws': {'fontsize': FONT_SIZE_TITLE},
+                }))
         else:
             # Single combined calendar
+            calendars.append(("all", "calendar_all", slice(None), {
+                'suptitle': 'Message Activity',
+                'figsize': (14, 2 + len(years) * 1.5),
+            }))
+
+        loop = asyncio.get_running_loop()
+
+        async def render(year, name: str, selection, kwargs: dict) -> Optional[dict]:
             try:
-                fig, ax = calplot.calplot(
-                    daily_counts,
-                    cmap='YlGn',
-                    colorbar=True,
-                    suptitle='Message Activity',
-                    figsize=(14, 2 + len(years) * 1.5),
-                )
-                img_data = self._fig_to_bytes(fig)
-                key = f"{storage_prefix}/calendar_all.png"
-                self.storage.upload_bytes(key, img_data, "image/png")
-                urls.append({
-                    "year": "all",
-                    "url": self.storage.get_presigned_url(key, expires_hours=24)
-                })
+                img_data = await loop.run_in_executor(
+                    _get_calendar_pool(), _render_calendar, days[selection], counts[selection], kwargs)
+                key = f"{storage_prefix}/{name}.png"
+                await asyncio.to_thread(self._upload_chart, key, img_data)
+                # Signed along with the other charts in _build_analytics
+                return {"year": year, "url": key}
             except Exception as e:
-                logger.warning(f"Failed to generate combined calendar: {e}")
+                if year == "all":
+                    logger.warning(f"Failed to generate combined calendar: {e}")
+                else:
+                    logger.warning(f"Failed to generate calendar for {year}: {e}")
+                return None
 
-        return urls
+        urls = await asyncio.gather(*(render(*calendar) for calendar in calendars))
+        return [url for url in urls if url is not None]
 
     def _create_comparison_heatmap(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         person1: str,
         person2: str,
         participants: list[dict],
     ) -> Optional[bytes]:
         """Create who-dominates-when comparison heatmap."""
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-        df1 = df[df['sender'].str.lower() == person1.lower()]
-        df2 = df[df['sender'].str.lower() == person2.lower()]
-
-        if df1.empty or df2.empty:
+        if not data.sender_codes(person1) or not data.sender_codes(person2):
             return None
 
-        pivot1 = df1.pivot_table(
-            index='day_name', columns='hour', values='datetime',
-            aggfunc='count', fill_value=0
-        ).reindex(day_order).fillna(0)
-
-        pivot2 = df2.pivot_table(
-            index='day_name', columns='hour', values='datetime',
-            aggfunc='count', fill_value=0
-        ).reindex(day_order).fillna(0)
-
-        # Ensure same columns
-        for h in range(24):
-            if h not in pivot1.columns:
-                pivot1[h] = 0
-            if h not in pivot2.columns:
-                pivot2[h] = 0
-        pivot1 = pivot1[sorted(pivot1.columns)]
-        pivot2 = pivot2[sorted(pivot2.columns)]
+        index = pd.Index(DAY_NAMES, name='day_name')
+        columns = pd.Index(range(24), name='hour')
+        pivot1 = pd.DataFrame(_day_hour_grid(data, person1), index=index, columns=columns)
+        pivot2 = pd.DataFrame(_day_hour_grid(data, person2), index=index, columns=columns)
 
         total = pivot1 + pivot2
         ratio = (pivot1 - pivot2) / total.replace(0, np.nan)
         ratio = ratio.fillna(0)
 
-        fig, ax = plt.subplots(figsize=(14, 5))
+        fig = Figure(figsize=(14, 5))
+        ax = fig.subplots()
 
         color1 = self._get_participant_color(person1, participants)
         color2 = self._get_participant_color(person2, participants)
@@ -445,19 +818,20 @@ class AnalyticsService:
         ax.set_ylabel('Day', fontsize=FONT_SIZE_LABEL)
         ax.tick_params(labelsize=FONT_SIZE_TICK)
 
-        plt.tight_layout()
+        fig.tight_layout()
         return self._fig_to_bytes(fig)
 
     def _create_trend_chart(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         person1: Optional[str],
         person2: Optional[str],
         participants: list[dict],
         years_span: float,
     ) -> bytes:
         """Create trend chart - monthly for short chats, quarterly/yearly for long ones."""
-        fig, ax = plt.subplots(figsize=(max(12, years_span * 2), 5))
+        fig = Figure(figsize=(max(12, years_span * 2), 5))
+        ax = fig.subplots()
 
         # Choose aggregation based on time span
         if years_span > 5:
@@ -474,19 +848,17 @@ class AnalyticsService:
             title = 'Monthly Message Volume'
 
         # Get top participants to show
-        top_senders = df['sender'].value_counts().head(5).index.tolist()
+        top_senders = data.sender_counts().head(5).index.tolist()
 
         # Aggregate
-        trend = df[df['sender'].isin(top_senders)].groupby(
-            [df[period_col], 'sender']
-        ).size().unstack(fill_value=0)
+        trend = _period_sender_counts(
+            data, period_col, [name if name in top_senders else None for name in data.senders]
+        )
 
         # Sort columns by total
         col_order = trend.sum().sort_values(ascending=False).index
         trend = trend[col_order]
 
-        trend.index = trend.index.astype(str)
-
         # Use participant colors
         colors = [self._get_participant_color(name, participants) for name in trend.columns]
 
@@ -506,45 +878,47 @@ class AnalyticsService:
                 if i % step != 0:
                     label.set_visible(False)
 
-        plt.xticks(rotation=45, ha='right', fontsize=FONT_SIZE_TICK)
-        plt.yticks(fontsize=FONT_SIZE_TICK)
-        plt.tight_layout()
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right', fontsize=FONT_SIZE_TICK)
+        plt.setp(ax.get_yticklabels(), fontsize=FONT_SIZE_TICK)
+        fig.tight_layout()
 
         return self._fig_to_bytes(fig)
 
     def _create_response_time_chart(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         person1: str,
         person2: str,
         participants: list[dict],
     ) -> Optional[bytes]:
         """Create response time analysis chart."""
-        df_sorted = df.sort_values('datetime').copy()
-
-        df_sorted['prev_sender'] = df_sorted['sender'].shift(1)
-        df_sorted['prev_time'] = df_sorted['datetime'].shift(1)
-        df_sorted['response_time'] = (
-            df_sorted['datetime'] - df_sorted['prev_time']
-        ).dt.total_seconds() / 60
+        # Minutes since the previous message; messages are in time order
+        response_time = np.full(len(data), np.nan)
+        response_time[1:] = np.diff(data.timestamp) / np.timedelta64(1, 's') / 60
+        prev_sender = np.empty_like(data.sender)
+        prev_sender[0] = -1
+        prev_sender[1:] = data.sender[:-1]
 
         # Only count actual responses
-        df_sorted = df_sorted[
-            (df_sorted['sender'] != df_sorted['prev_sender']) &
-            (df_sorted['response_time'] < 24 * 60) &
-            (df_sorted['response_time'] > 0)
-        ]
+        responses = (
+            (data.sender != prev_sender) &
+            (response_time < 24 * 60) &
+            (response_time > 0)
+        )
 
-        fig, axes = plt.subplots(1, 2, figsize=(12, 4))
+        fig = Figure(figsize=(12, 4))
+        axes = fig.subplots(1, 2)
 
         for idx, person in enumerate([person1, person2]):
-            person_df = df_sorted[df_sorted['sender'].str.lower() == person.lower()]
-            if person_df.empty:
+            mask = responses & data.sender_mask(person)
+            if not mask.any():
                 continue
 
-            avg_response = person_df.groupby('hour')['response_time'].mean()
+            # Mean response time per hour; hours without responses stay 0
+            totals = np.bincount(data.hour[mask], weights=response_time[mask], minlength=24)
+            counts = np.bincount(data.hour[mask], minlength=24)
             hours = range(24)
-            values = [avg_response.get(h, 0) for h in hours]
+            values = np.divide(totals, counts, out=np.zeros(24), where=counts > 0)
 
             color = self._get_participant_color(person, participants)
             axes[idx].bar(hours, values, color=color, alpha=0.8)
@@ -554,25 +928,33 @@ class AnalyticsService:
             axes[idx].set_xticks(range(0, 24, 3))
             axes[idx].tick_params(labelsize=FONT_SIZE_TICK)
 
-        plt.tight_layout()
+        fig.tight_layout()
         return self._fig_to_bytes(fig)
 
-    def _create_daily_activity_chart(self, df: pd.DataFrame, years_span: float) -> bytes:
+    def _create_daily_activity_chart(self, data: MessageData, years_span: float) -> bytes:
         """Create daily activity overview with rolling average."""
-        daily = df.groupby('date').size().reset_index(name='count')
-        daily['date'] = pd.to_datetime(daily['date'])
-        daily = daily.sort_values('date')
+        daily = data.daily_counts()
+        dates = daily.index
+        counts = daily.to_numpy()
 
-        fig, ax = plt.subplots(figsize=(max(12, years_span * 2), 4))
+        fig = Figure(figsize=(max(12, years_span * 2), 4))
+        ax = fig.subplots()
 
-        # Rolling average window based on time span
+        # Centered rolling average over days with messages, window based on
+        # time span; edges without a full window stay NaN
         window = min(30, max(7, int(years_span * 5)))
-        daily['rolling'] = daily['count'].rolling(window=window, center=True).mean()
+        rolling = np.full(len(counts), np.nan)
+        if len(counts) >= window:
+            start = window // 2
+            rolling[start:start + len(counts) - window + 1] = (
+                np.convolve(counts, np.ones(window), mode='valid') / window
+            )
+        average = counts.mean()
 
-        ax.fill_between(daily['date'], daily['count'], alpha=0.3, color='#3498db', label='Daily')
-        ax.plot(daily['date'], daily['rolling'], color='#e74c3c', linewidth=2, label=f'{window}-day avg')
-        ax.axhline(y=daily['count'].mean(), color='#2ecc71', linestyle='--',
-                   label=f'Overall avg: {daily["count"].mean():.1f}/day')
+        ax.fill_between(dates, counts, alpha=0.3, color='#3498db', label='Daily')
+        ax.plot(dates, rolling, color='#e74c3c', linewidth=2, label=f'{window}-day avg')
+        ax.axhline(y=average, color='#2ecc71', linestyle='--',
+                   label=f'Overall avg: {average:.1f}/day')
 
         ax.set_title('Daily Message Activity', fontsize=FONT_SIZE_TITLE, fontweight='bold')
         ax.set_xlabel('')
@@ -582,22 +964,24 @@ class AnalyticsService:
 
         # Format x-axis for long time spans
         if years_span > 3:
-            ax.xaxis.set_major_locator(plt.matplotlib.dates.YearLocator())
-            ax.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%Y'))
+            ax.xaxis.set_major_locator(mdates.YearLocator())
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
 
-        plt.tight_layout()
+        fig.tight_layout()
         return self._fig_to_bytes(fig)
 
     def _create_top_participants_chart(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         participants: list[dict],
     ) -> bytes:
         """Create bar chart of top participants by message count."""
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        fig = Figure(figsize=(14, 5))
+        axes = fig.subplots(1, 2)
 
         # Get top 10 senders
-        top_senders = df['sender'].value_counts().head(10)
+        sender_counts = data.sender_counts()
+        top_senders = sender_counts.head(10)
 
         # Bar chart
         colors = [self._get_participant_color(name, participants) for name in top_senders.index]
@@ -614,8 +998,8 @@ class AnalyticsService:
                         f'{count:,}', va='center', fontsize=FONT_SIZE_TICK)
 
         # Pie chart of participation share
-        total = len(df)
-        top_5 = df['sender'].value_counts().head(5)
+        total = len(data)
+        top_5 = sender_counts.head(5)
         others = total - top_5.sum()
 
         pie_labels = list(top_5.index) + (['Others'] if others > 0 else [])
@@ -628,17 +1012,18 @@ class AnalyticsService:
                    textprops={'fontsize': FONT_SIZE_TICK})
         axes[1].set_title('Message Share', fontsize=FONT_SIZE_TITLE, fontweight='bold')
 
-        plt.tight_layout()
+        fig.tight_layout()
         return self._fig_to_bytes(fig)
 
     def _create_participation_over_time(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         participants: list[dict],
         years_span: float,
     ) -> bytes:
         """Create stacked area chart showing participation over time."""
-        fig, ax = plt.subplots(figsize=(max(12, years_span * 2), 5))
+        fig = Figure(figsize=(max(12, years_span * 2), 5))
+        ax = fig.subplots()
 
         # Choose aggregation based on time span
         if years_span > 3:
@@ -649,23 +1034,17 @@ class AnalyticsService:
             title = 'Participation Over Time (Monthly)'
 
         # Get top 6 senders + Others
-        top_senders = df['sender'].value_counts().head(6).index.tolist()
+        top_senders = data.sender_counts().head(6).index.tolist()
 
-        # Create a copy and categorize non-top senders as "Others"
-        df_copy = df.copy()
-        df_copy['sender_grouped'] = df_copy['sender'].apply(
-            lambda x: x if x in top_senders else 'Others'
+        # Aggregate, with non-top senders grouped as "Others"
+        period_sender = _period_sender_counts(
+            data, period_col, [name if name in top_senders else 'Others' for name in data.senders]
         )
 
-        # Aggregate
-        period_sender = df_copy.groupby([df_copy[period_col], 'sender_grouped']).size().unstack(fill_value=0)
-
         # Sort columns by total (top first)
         col_order = period_sender.sum().sort_values(ascending=False).index
         period_sender = period_sender[col_order]
 
-        period_sender.index = period_sender.index.astype(str)
-
         # Use participant colors
         colors = []
         for name in period_sender.columns:
@@ -689,24 +1068,29 @@ class AnalyticsService:
                 if i % step != 0:
                     label.set_visible(False)
 
-        plt.xticks(rotation=45, ha='right', fontsize=FONT_SIZE_TICK)
-        plt.yticks(fontsize=FONT_SIZE_TICK)
-        plt.tight_layout()
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right', fontsize=FONT_SIZE_TICK)
+        plt.setp(ax.get_yticklabels(), fontsize=FONT_SIZE_TICK)
+        fig.tight_layout()
 
         return self._fig_to_bytes(fig)
 
     def _calculate_summary(
         self,
-        df: pd.DataFrame,
+        data: MessageData,
         person1: Optional[str],
         person2: Optional[str],
         participants: list[dict],
     ) -> dict:
         """Calculate summary statistics."""
-        total = int(len(df))
-        date_min = df['datetime'].min()
-        date_max = df['datetime'].max()
-        days_span = int((date_max - date_min).days)
+        total = int(len(data))
+        date_min = pd.Timestamp(data.timestamp[0], tz='UTC')
+        date_max = pd.Timestamp(data.timestamp[-1], tz='UTC')
+        days_span = data.days_span
+        grid = _day_hour_grid(data)
+        day_counts = grid.sum(axis=1)
+        # As with Series.mode(), ties go to the earliest hour (argmax) and to
+        # the alphabetically first day name
+        most_active_day = min(name for name, count in zip(DAY_NAMES, day_counts) if count == day_counts.max())
 
         summary = {
             "total_messages": total,
@@ -717,8 +1101,8 @@ class AnalyticsService:
                 "years": float(round(days_span / 365, 1)),
             },
             "avg_messages_per_day": float(round(total / max(1, days_span), 1)),
-            "most_active_hour": int(df['hour'].mode().iloc[0]) if not df['hour'].mode().empty else 12,
-            "most_active_day": str(df['day_name'].mode().iloc[0]) if not df['day_name'].mode().empty else "Monday",
+            "most_active_hour": int(grid.sum(axis=0).argmax()),
+            "most_active_day": most_active_day,
             "participants": [],
             "top_participants": [],  # For group chat summary
         }
@@ -726,19 +1110,19 @@ class AnalyticsService:
         # Per-participant stats (for comparison mode)
         for person in [person1, person2]:
             if person:
-                person_df = df[df['sender'].str.lower() == person.lower()]
-                if not person_df.empty:
-                    count = int(len(person_df))
+                if data.sender_codes(person):
+                    person_grid = _day_hour_grid(data, person)
+                    count = int(person_grid.sum())
                     summary["participants"].append({
                         "name": str(person),
                         "messages": count,
                         "percentage": float(round(count / total * 100, 1)),
-                        "most_active_hour": int(person_df['hour'].mode().iloc[0]) if not person_df['hour'].mode().empty else 12,
+                        "most_active_hour": int(person_grid.sum(axis=0).argmax()),
                         "color": self._get_participant_color(person, participants),
                     })
 
         # Top participants for group chat (always include)
-        top_senders = df['sender'].value_counts().head(10)
+        top_senders = data.sender_counts().head(10)
         for sender, count in top_senders.items():
             summary["top_participants"].append({
                 "name": str(sender),
@@ -748,26 +1132,16 @@ class AnalyticsService:
             })
 
         # Find longest streak
-        daily = df.groupby('date').size().reset_index(name='count')
-        daily['date'] = pd.to_datetime(daily['date'])
-        daily = daily.sort_values('date')
+        days = data.daily_counts().index.to_numpy().astype('datetime64[D]').astype(np.int64)
 
-        if len(daily) > 1:
-            daily['day_diff'] = daily['date'].diff().dt.days
-            daily['streak_break'] = daily['day_diff'] > 1
-            daily['streak_id'] = daily['streak_break'].cumsum()
-
-            streak_lengths = daily.groupby('streak_id').size()
-            longest_streak = int(streak_lengths.max())
-            summary["longest_streak_days"] = longest_streak
+        if len(days) > 1:
+            # Runs of consecutive active days, split wherever a day is skipped
+            breaks = np.flatnonzero(np.diff(days) > 1) + 1
+            streak_lengths = np.diff(np.concatenate(([0], breaks, [len(days)])))
+            summary["longest_streak_days"] = int(streak_lengths.max())
 
         return summary
 
     def _fig_to_bytes(self, fig) -> bytes:
         """Convert matplotlib figure to PNG bytes."""
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                    facecolor='white', edgecolor='none')
-        plt.close(fig)
-        buf.seek(0)
-        return buf.read()
+        return _fig_to_png(fig)
@@ -1,30 +1,81 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, update, case, and_, cast, Float, func, bindparam
+from sqlalchemy.engine import Row
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Iterable, Iterator, Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
 import asyncio
 import logging
+import time
 import zipfile
 import io
 import os
 
 from ..models import Conversation, Participant, Message, MediaFile, ImportJob
 from .parser import WhatsAppParser, ParsedMessage, clean_unicode
-from .storage import StorageService
-from .search import SearchService
+from .search import invalidate_search_cache
+from .storage import get_storage
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ChatSummary:
+    """What a conversation row needs to know about its messages."""
+
+    total: int = 0
+    senders: set[str] = field(default_factory=set)
+    # Lines per sender name, system lines included
+    message_counts: Counter = field(default_factory=Counter)
+    first_message_at: Optional[datetime] = None
+    last_message_at: Optional[datetime] = None
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[ParsedMessage]) -> "ChatSummary":
+        """Summarize messages in a single pass without keeping them."""
+        summary = cls()
+        counts = summary.message_counts
+        first = last = None
+        for m in messages:
+            counts[m.sender] += 1
+            if not m.is_system:
+                summary.senders.add(m.sender)
+            if first is None or m.timestamp < first:
+                first = m.timestamp
+            if last is None or m.timestamp > last:
+                last = m.timestamp
+        summary.total = counts.total()
+        summary.first_message_at = first
+        summary.last_message_at = last
+        return summary
+
+
 class ImporterService:
     """Service for importing WhatsApp chat exports."""
 
-    BATCH_SIZE = 1000  # Messages per batch insert
+    BATCH_SIZE = 20000  # Messages per batch insert
+
+    # Message columns written by COPY, in record order
+    _COPY_COLUMNS = [
+        "id",
+        "conversation_id",
+        "participant_id",
+        "participant_color",
+        "sender_name",
+        "content",
+        "message_type",
+        "timestamp",
+        "has_media",
+    ]
+    PROGRESS_INTERVAL = 0.5  # Seconds between progress commits
+    MEDIA_CONCURRENCY = 16  # Media files uploaded at once
 
     def __init__(self, db: AsyncSession):
         self.db = db
         self.parser = WhatsAppParser()
-        self.storage = StorageService()
+        self.storage = get_storage()
 
     async def create_import_job(
         self,
@@ -48,32 +99,74 @@ class ImporterService:
         self,
         job_id: int,
         chunk_number: int,
-        chunk_data: bytes,
+        chunk_data: BinaryIO,
+        length: int = -1,
     ) -> ImportJob:
-        """Upload a chunk of the import file."""
-        job = await self.db.get(ImportJob, job_id)
-        if not job:
-            raise ValueError(f"Import job {job_id} not found")
+        """Upload a chunk of the import file, streamed from a file object.
+
+        Chunks are stored before the job row is locked, so chunks of one
+        upload may arrive concurrently and in any order.
+        """
+        storage_key = self._upload_key(job_id)
 
-        # Store chunk in MinIO
-        storage_key = f"imports/{job_id}/file"
-        self.storage.append_chunk(storage_key, chunk_data, chunk_number)
+        upload = (await self.db.execute(
+            select(ImportJob.total_chunks).where(ImportJob.id == job_id)
+        )).one_or_none()
+        if not upload:
+            raise ValueError(f"Import job {job_id} not found")
+        # Checked before storing, as a stray chunk would complete the upload
+        if not 0 <= chunk_number < upload.total_chunks:
+            raise ValueError(f"Chunk {chunk_number} is out of range for {upload.total_chunks} chunks")
+
+        if upload.total_chunks == 1:
+            # A single chunk is the whole file; no assembly needed
+            await asyncio.to_thread(
+                self.storage.upload_file, storage_key, chunk_data, length, parallel=True,
+            )
+            size = length
+        else:
+            size = await asyncio.to_thread(
+                self.storage.append_chunk, storage_key, chunk_data, chunk_number, length,
+            )
 
-        # Update job progress
-        job.uploaded_chunks = chunk_number + 1
+        # Record the chunk's size with an atomic jsonb merge and count it;
+        # a retried chunk overwrites its own entry and is not counted twice
+        chunk = str(chunk_number)
+        stmt = (
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                uploaded_chunks=ImportJob.uploaded_chunks
+                + case((ImportJob.chunk_sizes.has_key(chunk), 0), else_=1),
+                chunk_sizes=func.coalesce(ImportJob.chunk_sizes, func.jsonb_build_object())
+                .op("||")(func.jsonb_build_object(chunk, size)),
+            )
+            .returning(ImportJob)
+            .execution_options(populate_existing=True)
+        )
+        job = (await self.db.scalars(stmt)).one()
+        # A chunk retried after the upload finished must not assemble it again
+        complete = job.status == "uploading" and len(job.chunk_sizes) >= job.total_chunks
         await self.db.commit()
 
-        # Check if all chunks uploaded
-        if job.uploaded_chunks >= job.total_chunks:
-            # Assemble chunks
-            self.storage.assemble_chunks(storage_key, job.total_chunks)
-            job.temp_storage_key = storage_key
-            job.status = "pending"
-            await self.db.commit()
+        return await self._finish_upload(job, storage_key) if complete else job
+
+    async def _finish_upload(self, job: ImportJob, storage_key: str) -> ImportJob:
+        """Put the uploaded file together once every chunk is stored."""
+        if job.total_chunks > 1:
+            sizes = [job.chunk_sizes[str(i)] for i in range(job.total_chunks)]
+            await asyncio.to_thread(self.storage.assemble_chunks, storage_key, sizes)
+        job.temp_storage_key = storage_key
+        job.status = "pending"
+        await self.db.commit()
 
-        await self.db.refresh(job)
         return job
 
+    @staticmethod
+    def _upload_key(job_id: int) -> str:
+        """Storage key of an import's uploaded file."""
+        return f"imports/{job_id}/file"
+
     async def start_import(self, job_id: int) -> ImportJob:
         """Start processing an import job."""
         job = await self.db.get(ImportJob, job_id)
@@ -103,8 +196,10 @@ class ImporterService:
                 return
 
             try:
-                # Download file from MinIO
-                file_data = self.storage.download_file(job.temp_storage_key)
+                # Download file from MinIO, off the event loop
+                file_data = await asyncio.to_thread(
+                    self.storage.download_file_parallel, job.temp_storage_key,
+                )
 
                 # Check if it's a ZIP file
                 if job.filename and job.filename.lower().endswith(".zip"):
@@ -121,6 +216,7 @@ class ImporterService:
                 job.error_message = str(e)
 
             await db.commit()
+            invalidate_search_cache(job.conversation_id)
 
             # Cleanup temp file
             try:
@@ -132,38 +228,33 @@ class ImporterService:
         self,
         db: AsyncSession,
         job: ImportJob,
-        file_data: bytes,
+        file_data: BinaryIO,
     ):
         """Process a plain text chat export."""
-        content = file_data.decode("utf-8", errors="replace")
-
-        # Parse and count messages first
-        messages_list = list(self.parser.parse_content(content))
-        job.total_messages = len(messages_list)
+        # Count messages in a first parsing pass, without keeping them
+        summary = ChatSummary.from_messages(self._read_messages(file_data))
+        job.total_messages = summary.total
         await db.commit()
 
-        if not messages_list:
+        if not summary.total:
             raise ValueError("No messages found in file")
 
         # Create conversation
-        conversation = await self._create_conversation(db, job.filename or "Imported Chat", messages_list)
+        conversation, participants = await self._create_conversation(db, job.filename or "Imported Chat", summary)
         job.conversation_id = conversation.id
 
-        # Import messages
-        await self._import_messages(db, job, conversation, messages_list)
-
-        # Update search vectors
-        search_service = SearchService(db)
-        await search_service.bulk_update_search_vectors(conversation.id)
+        # Import messages, parsing the content again as they are written
+        file_data.seek(0)
+        await self._import_messages(db, job, conversation, participants, self._read_messages(file_data))
 
     async def _process_zip_import(
         self,
         db: AsyncSession,
         job: ImportJob,
-        file_data: bytes,
+        file_data: BinaryIO,
     ):
         """Process a ZIP file containing chat export and media."""
-        with zipfile.ZipFile(io.BytesIO(file_data), "r") as zf:
+        with zipfile.ZipFile(file_data, "r") as zf:
             # Find the chat file
             chat_file = None
             media_files = []
@@ -181,12 +272,12 @@ class ImporterService:
             await db.commit()
 
             # Parse chat file
-            chat_content = zf.read(chat_file).decode("utf-8", errors="replace")
-            messages_list = list(self.parser.parse_content(chat_content))
-            job.total_messages = len(messages_list)
+            with zf.open(chat_file) as raw:
+                summary = ChatSummary.from_messages(self._read_messages(raw))
+            job.total_messages = summary.total
             await db.commit()
 
-            if not messages_list:
+            if not summary.total:
                 raise ValueError("No messages found in chat file")
 
             # Extract conversation name from filename
@@ -195,130 +286,139 @@ class ImporterService:
                 conv_name = conv_name[19:]
 
             # Create conversation
-            conversation = await self._create_conversation(db, conv_name, messages_list)
+            conversation, participants = await self._create_conversation(db, conv_name, summary)
             job.conversation_id = conversation.id
 
             # Import messages
-            message_map = await self._import_messages(db, job, conversation, messages_list)
+            with zf.open(chat_file) as raw:
+                message_map = await self._import_messages(
+                    db, job, conversation, participants, self._read_messages(raw)
+                )
 
             # Import media files
             await self._import_media(db, job, conversation, zf, media_files, message_map)
 
-            # Update search vectors
-            search_service = SearchService(db)
-            await search_service.bulk_update_search_vectors(conversation.id)
+    def _read_messages(self, raw: BinaryIO) -> Iterator[ParsedMessage]:
+        """Parse a chat export from a binary stream, one line at a time.
+
+        Lines are split on "\n" only, as parse_content does. raw is left open,
+        so it can be read again.
+        """
+        reader = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="\n")
+        try:
+            yield from self.parser.parse_lines(reader)
+        finally:
+            reader.detach()
 
     async def _create_conversation(
         self,
         db: AsyncSession,
         name: str,
-        messages: list[ParsedMessage],
-    ) -> Conversation:
-        """Create a conversation from parsed messages."""
-        # Determine if it's a group chat
-        senders = set(m.sender for m in messages if not m.is_system)
-        is_group = len(senders) > 2
-
-        # Get first and last message timestamps
-        timestamps = [m.timestamp for m in messages]
-        first_message = min(timestamps) if timestamps else None
-        last_message = max(timestamps) if timestamps else None
+        summary: ChatSummary,
+    ) -> tuple[Conversation, dict[str, tuple[int, str]]]:
+        """Create a conversation and its participants from a message summary.
+
+        Returns the conversation and a map of participant name to (id, color).
+        """
+        senders = summary.senders
 
         conversation = Conversation(
             name=name,
-            is_group=is_group,
-            message_count=len(messages),
-            first_message_at=first_message,
-            last_message_at=last_message,
+            # Determine if it's a group chat
+            is_group=len(senders) > 2,
+            message_count=summary.total,
+            first_message_at=summary.first_message_at,
+            last_message_at=summary.last_message_at,
         )
         db.add(conversation)
-        await db.commit()
-        await db.refresh(conversation)
-
-        # Create participants
-        for idx, sender in enumerate(sorted(senders)):
-            participant = Participant(
-                conversation_id=conversation.id,
-                name=sender,
-                color=Participant.get_color(idx),
-                message_count=sum(1 for m in messages if m.sender == sender),
-            )
-            db.add(participant)
+        await db.flush()
+
+        # Create participants in one INSERT ... RETURNING
+        rows = [
+            {
+                "conversation_id": conversation.id,
+                "name": sender,
+                "color": color,
+                "message_count": summary.message_counts[sender],
+            }
+            for sender, color in zip(sorted(senders), Participant.color_cycle())
+        ]
+        participants = {}
+        if rows:
+            stmt = insert(Participant).returning(Participant.name, Participant.id, Participant.color)
+            result = await db.execute(stmt, rows)
+            participants = {name: (participant_id, color) for name, participant_id, color in result.all()}
 
         await db.commit()
-        return conversation
+        return conversation, participants
 
     async def _import_messages(
         self,
         db: AsyncSession,
         job: ImportJob,
         conversation: Conversation,
-        messages: list[ParsedMessage],
+        participants: dict[str, tuple[int, str]],
+        messages: Iterable[ParsedMessage],
     ) -> dict[str, int]:
-        """Import messages in batches. Returns map of media filename to message ID."""
-        # Get participant mapping
-        stmt = select(Participant).where(Participant.conversation_id == conversation.id)
-        result = await db.execute(stmt)
-        participants = {p.name: p for p in result.scalars().all()}
-
-        # Track which messages have media (by index)
-        media_message_indices = {}  # index -> media_filename
-        batch = []
-        batch_start_idx = 0
-
-        # Map media filename to message ID (populated after commit)
+        """Import messages in batches. Returns map of media filename to message ID.
+
+        messages is consumed lazily, so only one batch is held at a time.
+
+        participants maps sender name to (participant id, color). Batches and
+        the processed_messages counter are committed at most every
+        PROGRESS_INTERVAL seconds, and once at the end.
+        """
+        no_participant = (None, None)
+
+        # Rows go in with COPY on the session's asyncpg connection, inside
+        # its transaction. COPY returns nothing, so ids are reserved from the
+        # table's sequence up front.
+        next_ids = (
+            select(func.nextval(func.pg_get_serial_sequence(Message.__tablename__, "id")))
+            .select_from(func.generate_series(1, bindparam("n")))
+        )
+
+        # Map media filename to message ID
         message_map = {}
 
-        for idx, parsed in enumerate(messages):
-            participant = participants.get(parsed.sender)
-
-            message = Message(
-                conversation_id=conversation.id,
-                participant_id=participant.id if participant else None,
-                sender_name=parsed.sender,
-                content=parsed.content,
-                message_type=parsed.message_type,
-                timestamp=parsed.timestamp,
-                has_media=parsed.has_media,
+        messages = iter(messages)
+        processed = 0
+        last_commit = time.monotonic()
+        while batch := list(islice(messages, self.BATCH_SIZE)):
+            # Ascending ids keep message order for the (timestamp, id) keyset
+            ids = sorted((await db.scalars(next_ids, {"n": len(batch)})).all())
+
+            records = []
+            for parsed, message_id in zip(batch, ids):
+                participant_id, color = participants.get(parsed.sender, no_participant)
+                records.append((
+                    message_id,
+                    conversation.id,
+                    participant_id,
+                    color,
+                    parsed.sender,
+                    parsed.content,
+                    parsed.message_type,
+                    parsed.timestamp,
+                    parsed.has_media,
+                ))
+                if parsed.media_filename:
+                    message_map[parsed.media_filename] = message_id
+
+            # A commit releases the connection, so look it up per batch
+            connection = await db.connection()
+            raw = (await connection.get_raw_connection()).driver_connection
+            await raw.copy_records_to_table(
+                Message.__tablename__, records=records, columns=self._COPY_COLUMNS
             )
-            batch.append(message)
-
-            # Track media filename for later linking
-            if parsed.media_filename:
-                media_message_indices[idx] = parsed.media_filename
-
-            # Batch insert
-            if len(batch) >= self.BATCH_SIZE:
-                db.add_all(batch)
-                await db.flush()  # Flush to get IDs
-
-                # Map media filenames to message IDs
-                for i, msg in enumerate(batch):
-                    global_idx = batch_start_idx + i
-                    if global_idx in media_message_indices:
-                        message_map[media_message_indices[global_idx]] = msg.id
 
+            processed += len(batch)
+            job.processed_messages = processed
+            if time.monotonic() - last_commit >= self.PROGRESS_INTERVAL:
                 await db.commit()
-                job.processed_messages = idx + 1
-                await db.commit()
-                batch_start_idx = idx + 1
-                batch = []
-
-        # Insert remaining
-        if batch:
-            db.add_all(batch)
-            await db.flush()  # Flush to get IDs
-
-            # Map media filenames to message IDs
-            for i, msg in enumerate(batch):
-                global_idx = batch_start_idx + i
-                if global_idx in media_message_indices:
-                    message_map[media_message_indices[global_idx]] = msg.id
-
-            await db.commit()
-            job.processed_messages = len(messages)
-            await db.commit()
+                last_commit = time.monotonic()
 
+        await db.commit()
         return message_map
 
     async def _import_media(
@@ -330,46 +430,86 @@ class ImporterService:
         media_files: list[str],
         message_map: dict[str, int],
     ):
-        """Import media files from ZIP. message_map is filename -> message_id."""
-        for idx, media_path in enumerate(media_files):
-            try:
-                # Read file from ZIP
-                media_data = zf.read(media_path)
-                filename = os.path.basename(media_path)
-                # Clean filename for matching (remove invisible unicode chars)
-                clean_filename = clean_unicode(filename).strip()
-
-                # Determine media type
-                ext = os.path.splitext(filename)[1].lower()
-                media_type = self._get_media_type(ext)
-                mime_type = self._get_mime_type(ext)
-
-                # Upload to MinIO
-                storage_key = f"conversations/{conversation.id}/media/{clean_filename}"
-                self.storage.upload_bytes(storage_key, media_data, mime_type)
-
-                # Find associated message by ID (try both original and clean filename)
-                message_id = message_map.get(clean_filename) or message_map.get(filename)
-                if message_id:
-                    # Create media file record
-                    media_file = MediaFile(
-                        message_id=message_id,
-                        storage_key=storage_key,
-                        original_filename=clean_filename,
-                        media_type=media_type,
-                        mime_type=mime_type,
-                        file_size=len(media_data),
+        """Import media files from ZIP. message_map is filename -> message_id.
+
+        Up to MEDIA_CONCURRENCY files are uploaded at once in worker threads.
+        Media rows are collected as uploads finish and written with one
+        multi-row INSERT per commit, at most every PROGRESS_INTERVAL seconds.
+        """
+        semaphore = asyncio.Semaphore(self.MEDIA_CONCURRENCY)
+
+        async def upload(media_path: str) -> Optional[dict]:
+            async with semaphore:
+                try:
+                    filename = os.path.basename(media_path)
+                    # Clean filename for matching (remove invisible unicode chars)
+                    clean_filename = clean_unicode(filename).strip()
+
+                    # Determine media type
+                    ext = os.path.splitext(filename)[1].lower()
+                    media_type = self._get_media_type(ext)
+                    mime_type = self._get_mime_type(ext)
+
+                    storage_key = f"conversations/{conversation.id}/media/{clean_filename}"
+                    file_size = await asyncio.to_thread(
+                        self._upload_media, zf, media_path, storage_key, mime_type
                     )
-                    db.add(media_file)
-                    logger.info(f"Linked media {clean_filename} to message {message_id}")
-                else:
-                    logger.warning(f"No message found for media: {clean_filename}")
+                except Exception as e:
+                    logger.warning(f"Failed to import media {media_path}: {e}")
+                    return None
+
+            # Find associated message by ID (try both original and clean filename)
+            message_id = message_map.get(clean_filename) or message_map.get(filename)
+            if not message_id:
+                logger.warning(f"No message found for media: {clean_filename}")
+                return None
+
+            logger.info(f"Linked media {clean_filename} to message {message_id}")
+            return {
+                "message_id": message_id,
+                "storage_key": storage_key,
+                "original_filename": clean_filename,
+                "media_type": media_type,
+                "mime_type": mime_type,
+                "file_size": file_size,
+            }
+
+        async def commit(rows: list[dict]):
+            if rows:
+                await db.execute(insert(MediaFile), rows)
+                rows.clear()
+            await db.commit()
 
-                job.processed_media = idx + 1
-                await db.commit()
+        # The session is only touched here, never from the upload tasks
+        pending = []
+        last_commit = time.monotonic()
+        uploads = asyncio.as_completed([upload(media_path) for media_path in media_files])
+        for idx, uploaded in enumerate(uploads):
+            row = await uploaded
+            if row is not None:
+                pending.append(row)
 
-            except Exception as e:
-                logger.warning(f"Failed to import media {media_path}: {e}")
+            job.processed_media = idx + 1
+            if time.monotonic() - last_commit >= self.PROGRESS_INTERVAL:
+                await commit(pending)
+                last_commit = time.monotonic()
+
+        job.processed_media = len(media_files)
+        await commit(pending)
+
+    def _upload_media(
+        self,
+        zf: zipfile.ZipFile,
+        media_path: str,
+        storage_key: str,
+        mime_type: str,
+    ) -> int:
+        """Stream one ZIP entry to MinIO, one part in memory at a time. Returns its size."""
+        # Size comes from the ZIP directory, without decompressing
+        file_size = zf.getinfo(media_path).file_size
+        with zf.open(media_path) as src:
+            self.storage.upload_file(storage_key, src, file_size, mime_type)
+        return file_size
 
     def _get_media_type(self, ext: str) -> str:
         """Get media type from file extension."""
@@ -408,6 +548,38 @@ class ImporterService:
         }
         return mime_types.get(ext, "application/octet-stream")
 
-    async def get_import_progress(self, job_id: int) -> Optional[ImportJob]:
-        """Get the current progress of an import job."""
-        return await self.db.get(ImportJob, job_id)
+    async def get_import_progress(self, job_id: int) -> Optional[Row]:
+        """Get the current progress of an import job.
+
+        Upload counts for the first 50%, messages for the next 40% and media
+        for the last 10%; the percentage is computed in the query itself.
+        """
+        media_progress = case(
+            (ImportJob.total_media > 0, cast(ImportJob.processed_media, Float) / ImportJob.total_media * 10),
+            else_=0.0,
+        )
+        progress = case(
+            (
+                and_(ImportJob.status == "uploading", ImportJob.total_chunks > 0),
+                cast(ImportJob.uploaded_chunks, Float) / ImportJob.total_chunks * 50,
+            ),
+            (
+                and_(ImportJob.status == "processing", ImportJob.total_messages > 0),
+                50 + cast(ImportJob.processed_messages, Float) / ImportJob.total_messages * 40 + media_progress,
+            ),
+            (ImportJob.status == "completed", 100.0),
+            else_=0.0,
+        )
+
+        stmt = select(
+            ImportJob.id.label("job_id"),
+            ImportJob.status,
+            progress.label("progress_percent"),
+            ImportJob.total_messages,
+            ImportJob.processed_messages,
+            ImportJob.total_media,
+            ImportJob.processed_media,
+            ImportJob.error_message,
+        ).where(ImportJob.id == job_id)
+        result = await self.db.execute(stmt)
+        return result.one_or_none()
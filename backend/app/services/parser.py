@@ -1,23 +1,22 @@
 import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterator, Optional
+from typing import Iterable, Iterator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Unicode characters to strip (invisible formatting characters)
 UNICODE_STRIP_CHARS = '\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069\ufeff'
+_STRIP_TABLE = str.maketrans('', '', UNICODE_STRIP_CHARS)
 
 
 def clean_unicode(text: str) -> str:
     """Remove invisible Unicode formatting characters."""
-    for char in UNICODE_STRIP_CHARS:
-        text = text.replace(char, '')
-    return text
+    return text.translate(_STRIP_TABLE)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedMessage:
     timestamp: datetime
     sender: str
@@ -45,11 +44,27 @@ class WhatsAppParser:
         (r"\[(\d{2})/(\d{2})/(\d{4}),\s*(\d{2}):(\d{2})\]", "%d/%m/%Y %H:%M"),
     ]
 
-    # Message line pattern: [timestamp] sender: message
-    MESSAGE_PATTERN = re.compile(r"^\[([^\]]+)\]\s*([^:]+):\s*(.*)$")
+    # Line pattern: "[timestamp] sender: message", or "[timestamp] text" for
+    # system messages (no sender). Each branch has its own \s* so the
+    # sender form is tried in full before falling back to the system form.
+    LINE_PATTERN = re.compile(r"^\[([^\]]+)\](?:\s*([^:]+):\s*(.*)|\s*(.+))$")
+
+    # Formats with zero-padded days (%d) and non-padded days (%-d on Unix, %#d on Windows)
+    TIMESTAMP_FORMATS = [
+        "%d.%m.%Y, %H:%M:%S",
+        "%d.%m.%Y, %H:%M",
+        "%d/%m/%Y, %H:%M:%S",
+        "%d/%m/%Y, %H:%M",
+        "%m/%d/%y, %I:%M:%S %p",
+        "%m/%d/%y, %I:%M %p",
+        "%d.%m.%y, %H:%M:%S",
+        "%d.%m.%y, %H:%M",
+    ]
 
-    # System message pattern (no sender)
-    SYSTEM_PATTERN = re.compile(r"^\[([^\]]+)\]\s*(.+)$")
+    # Timestamp fast path: D.M.Y / D/M/Y (24h) and M/D/YY with AM/PM
+    TIMESTAMP_PATTERN = re.compile(
+        r"(\d{1,2})([./])(\d{1,2})\2(\d{4}|\d{2}),\s+(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\s+([AaPp][Mm]))?"
+    )
 
     # Media indicators - patterns to detect media messages
     MEDIA_PATTERNS = {
@@ -93,6 +108,16 @@ class WhatsAppParser:
         "location": [r"location:"],
     }
 
+    # MEDIA_PATTERNS compiled into one case-insensitive alternation per
+    # media type, tried in the same order
+    MEDIA_TYPE_PATTERNS = [
+        (media_type, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+        for media_type, patterns in MEDIA_PATTERNS.items()
+    ]
+
+    # Attached media filename
+    ATTACHMENT_PATTERN = re.compile(r"<attached:\s*([^>]+)>")
+
     # System message indicators
     SYSTEM_INDICATORS = [
         "Messages and calls are end-to-end encrypted",
@@ -109,6 +134,9 @@ class WhatsAppParser:
         "Missed video call",
     ]
 
+    # SYSTEM_INDICATORS as one alternation, matched against lowercased content
+    SYSTEM_INDICATOR_PATTERN = re.compile("|".join(re.escape(i.lower()) for i in SYSTEM_INDICATORS))
+
     def __init__(self):
         self._detected_format = None
 
@@ -123,24 +151,25 @@ class WhatsAppParser:
         """Parse timestamp string to datetime."""
         timestamp_str = clean_unicode(timestamp_str).strip("[]").strip()
 
-        # Formats with zero-padded days (%d) and non-padded days (%-d on Unix, %#d on Windows)
-        # We'll try both by using a regex to normalize first
-        formats = [
-            "%d.%m.%Y, %H:%M:%S",
-            "%d.%m.%Y, %H:%M",
-            "%d/%m/%Y, %H:%M:%S",
-            "%d/%m/%Y, %H:%M",
-            "%m/%d/%y, %I:%M:%S %p",
-            "%m/%d/%y, %I:%M %p",
-            "%d.%m.%y, %H:%M:%S",
-            "%d.%m.%y, %H:%M",
-        ]
-
-        for fmt in formats:
+        timestamp = self._fast_parse_timestamp(timestamp_str)
+        if timestamp is not None:
+            return timestamp
+
+        # The format that last matched is tried first; no two formats accept
+        # the same string, so the order does not change the result
+        if self._detected_format:
             try:
-                return datetime.strptime(timestamp_str, fmt)
+                return datetime.strptime(timestamp_str, self._detected_format)
+            except ValueError:
+                pass
+
+        for fmt in self.TIMESTAMP_FORMATS:
+            try:
+                timestamp = datetime.strptime(timestamp_str, fmt)
             except ValueError:
                 continue
+            self._detected_format = fmt
+            return timestamp
 
         # Try with manual parsing for single-digit days like "5.10.2024, 13:03:10"
         try:
@@ -156,27 +185,60 @@ class WhatsAppParser:
         logger.warning(f"Could not parse timestamp: {timestamp_str}")
         return None
 
+    def _fast_parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        """Build the datetime straight from TIMESTAMP_PATTERN's groups.
+
+        Only layouts that the strptime formats in parse_timestamp accept are
+        handled; anything else returns None and takes the full format chain.
+        """
+        match = self.TIMESTAMP_PATTERN.fullmatch(timestamp_str)
+        if not match:
+            return None
+
+        first, separator, second, year_str, hour_str, minute, seconds, meridiem = match.groups()
+        short_year = len(year_str) == 2
+        hour = int(hour_str)
+
+        if meridiem:
+            # %m/%d/%y, %I:%M %p
+            if separator != "/" or not short_year or not 1 <= hour <= 12:
+                return None
+            month, day = int(first), int(second)
+            hour = hour % 12 + (12 if meridiem.upper() == "PM" else 0)
+        else:
+            # Day-first, 24h; slashed dates with a short year need AM/PM
+            if separator == "/" and short_year:
+                return None
+            day, month = int(first), int(second)
+
+        year = int(year_str)
+        if short_year:
+            # Same pivot as strptime's %y
+            year += 1900 if year >= 69 else 2000
+
+        try:
+            return datetime(year, month, day, hour, int(minute), int(seconds or 0))
+        except ValueError:
+            return None
+
     def detect_media_type(self, content: str) -> tuple[str, bool, Optional[str]]:
-        """Detect if message contains media and its type."""
-        # Clean invisible unicode characters for matching
-        clean_content = clean_unicode(content)
-
-        for media_type, patterns in self.MEDIA_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, clean_content, re.IGNORECASE):
-                    # Try to extract filename - clean it too
-                    filename_match = re.search(r"<attached:\s*([^>]+)>", clean_content)
-                    filename = filename_match.group(1).strip() if filename_match else None
-                    return media_type, True, filename
+        """Detect if message contains media and its type.
+
+        content must already be passed through clean_unicode, as parse_line
+        does for the whole line.
+        """
+        for media_type, pattern in self.MEDIA_TYPE_PATTERNS:
+            if pattern.search(content):
+                # Try to extract filename
+                filename_match = self.ATTACHMENT_PATTERN.search(content)
+                filename = filename_match.group(1).strip() if filename_match else None
+                return media_type, True, filename
 
         return "text", False, None
 
     def is_system_message(self, content: str, sender: str) -> bool:
         """Check if message is a system message."""
-        for indicator in self.SYSTEM_INDICATORS:
-            if indicator.lower() in content.lower():
-                return True
-        return False
+        return self.SYSTEM_INDICATOR_PATTERN.search(content.lower()) is not None
 
     def parse_line(self, line: str) -> Optional[ParsedMessage]:
         """Parse a single line from the chat export."""
@@ -185,12 +247,14 @@ class WhatsAppParser:
         if not line:
             return None
 
-        # Try to match message pattern
-        match = self.MESSAGE_PATTERN.match(line)
-        if match:
-            timestamp_str, sender, content = match.groups()
-            timestamp = self.parse_timestamp(timestamp_str)
+        match = self.LINE_PATTERN.match(line)
+        if not match:
+            return None
+
+        timestamp_str, sender, content, system_content = match.groups()
+        timestamp = self.parse_timestamp(timestamp_str)
 
+        if sender is not None:
             if not timestamp:
                 return None
 
@@ -215,51 +279,23 @@ class WhatsAppParser:
                 is_system=is_system,
             )
 
-        # Try system message pattern (messages without sender)
-        sys_match = self.SYSTEM_PATTERN.match(line)
-        if sys_match:
-            timestamp_str, content = sys_match.groups()
-            timestamp = self.parse_timestamp(timestamp_str)
-
-            if timestamp:
-                return ParsedMessage(
-                    timestamp=timestamp,
-                    sender="System",
-                    content=content.strip(),
-                    message_type="system",
-                    is_system=True,
-                )
+        # System message (no sender)
+        if timestamp:
+            return ParsedMessage(
+                timestamp=timestamp,
+                sender="System",
+                content=system_content.strip(),
+                message_type="system",
+                is_system=True,
+            )
 
         return None
 
-    def parse_file(self, file_path: str) -> Iterator[ParsedMessage]:
-        """Parse a WhatsApp chat export file."""
-        current_message: Optional[ParsedMessage] = None
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                parsed = self.parse_line(line)
-
-                if parsed:
-                    # Yield previous message if exists
-                    if current_message:
-                        yield current_message
-                    current_message = parsed
-                elif current_message and line.strip():
-                    # Continuation of previous message (multi-line)
-                    clean_line = clean_unicode(line).strip()
-                    if clean_line:
-                        current_message.content += "\n" + clean_line
-
-            # Yield last message
-            if current_message:
-                yield current_message
-
-    def parse_content(self, content: str) -> Iterator[ParsedMessage]:
-        """Parse WhatsApp chat export from string content."""
+    def parse_lines(self, lines: Iterable[str]) -> Iterator[ParsedMessage]:
+        """Parse WhatsApp chat export lines from any line iterator."""
         current_message: Optional[ParsedMessage] = None
 
-        for line in content.split("\n"):
+        for line in lines:
             parsed = self.parse_line(line)
 
             if parsed:
@@ -267,7 +303,7 @@ class WhatsAppParser:
                     yield current_message
                 current_message = parsed
             elif current_message and line.strip():
-                # Clean unicode from continuation lines too
+                # Continuation of previous message (multi-line); clean it too
                 clean_line = clean_unicode(line).strip()
                 if clean_line:
                     current_message.content += "\n" + clean_line
@@ -275,6 +311,15 @@ class WhatsAppParser:
         if current_message:
             yield current_message
 
+    def parse_file(self, file_path: str) -> Iterator[ParsedMessage]:
+        """Parse a WhatsApp chat export file."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from self.parse_lines(f)
+
+    def parse_content(self, content: str) -> Iterator[ParsedMessage]:
+        """Parse WhatsApp chat export from string content."""
+        return self.parse_lines(content.split("\n"))
+
     async def parse_stream(self, stream) -> Iterator[ParsedMessage]:
         """Parse WhatsApp chat export from async stream."""
         current_message: Optional[ParsedMessage] = None
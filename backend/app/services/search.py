@@ -1,12 +1,49 @@
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func, literal, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
+from datetime import datetime
 from typing import Optional
-from ..models import Message, Conversation, Participant
+from ..models import Message, Conversation
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Word characters other than "_", which the 'simple' parser yields no
+# lexemes for
+_WORD_RE = re.compile(r"[^\W_]")
+
+# Version stamps for cached search results, per conversation id. None is
+# bumped on every change and covers the searches that span all
+# conversations. The stamps are per process: a change made by another
+# worker only shows once that worker's cached entries expire.
+_search_versions: dict[Optional[int], int] = {}
+
+
+def search_version(conversation_id: Optional[int] = None) -> int:
+    """Version stamp to key cached searches over a conversation (or all) by."""
+    return _search_versions.get(conversation_id, 0)
+
+
+def invalidate_search_cache(conversation_id: Optional[int] = None) -> None:
+    """Make cached searches touching a conversation miss from now on."""
+    if conversation_id is not None:
+        _search_versions[conversation_id] = _search_versions.get(conversation_id, 0) + 1
+    _search_versions[None] = _search_versions.get(None, 0) + 1
+
+
+def _prefix_tsquery(query: str):
+    """tsquery requiring every word of query as a prefix, e.g. 'mer':* & 'yar':*.
+
+    The words are the lexemes Postgres itself extracts with the 'simple'
+    configuration, the same one search_vector is built with, quoted so that
+    no query text is parsed as tsquery syntax.
+    """
+    lexemes = func.unnest(func.to_tsvector("simple", query)).table_valued("lexeme")
+    quoted = func.replace(func.replace(lexemes.c.lexeme, "\\", "\\\\"), "'", "''")
+    terms = select(func.string_agg(func.concat("'", quoted, "':*"), " & ")).scalar_subquery()
+    return func.to_tsquery("simple", func.coalesce(terms, ""))
+
 
 class SearchService:
     """Full-text search service for messages."""
@@ -20,44 +57,58 @@ class SearchService:
         conversation_id: Optional[int] = None,
         page: int = 1,
         per_page: int = 50,
+        cursor: Optional[tuple[datetime, int]] = None,
     ) -> dict:
-        """Search messages using PostgreSQL full-text search or ILIKE fallback."""
-        offset = (page - 1) * per_page
-
-        # Use ILIKE for better multilingual support (Turkish, etc.)
-        search_pattern = f"%{query}%"
-
-        # Base query with eager loading
+        """Search messages using PostgreSQL full-text search or ILIKE fallback.
+
+        Every word of the query must start a word of the message, matched
+        against the GIN-indexed search_vector. Queries without any word
+        characters (punctuation, underscores, emoji) fall back to a
+        substring ILIKE.
+
+        cursor is the (timestamp, id) of the last message already shown; the
+        page then seeks past it instead of using page offsets, and total
+        counts the matches from the cursor onwards.
+        """
+        offset = 0 if cursor else (page - 1) * per_page
+
+        if _WORD_RE.search(query):
+            predicate = Message.search_vector.op("@@")(_prefix_tsquery(query))
+        else:
+            # Match the query literally; "_" and "%" are LIKE wildcards
+            escaped = re.sub(r"([\\%_])", r"\\\1", query)
+            predicate = Message.content.ilike(f"%{escaped}%", escape="\\")
+
+        # Base query with eager loading; the total match count rides along
+        # as a window column
         stmt = (
-            select(Message)
-            .options(
-                selectinload(Message.participant),
-                selectinload(Message.media_files),
-            )
-            .where(Message.content.ilike(search_pattern))
+            select(Message, func.count().over().label("total"))
+            .options(selectinload(Message.media_files), raiseload("*"))
+            .where(predicate)
         )
+        count_stmt = select(func.count()).select_from(Message).where(predicate)
 
         # Filter by conversation if specified
         if conversation_id:
             stmt = stmt.where(Message.conversation_id == conversation_id)
-
-        # Count total matches
-        count_stmt = (
-            select(func.count())
-            .select_from(Message)
-            .where(Message.content.ilike(search_pattern))
-        )
-        if conversation_id:
             count_stmt = count_stmt.where(Message.conversation_id == conversation_id)
 
-        total_result = await self.db.execute(count_stmt)
-        total = total_result.scalar() or 0
+        # Keyset filter
+        if cursor:
+            keyset = tuple_(Message.timestamp, Message.id) < tuple_(*cursor)
+            stmt = stmt.where(keyset)
+            count_stmt = count_stmt.where(keyset)
 
-        # Get results ordered by timestamp desc
-        stmt = stmt.order_by(Message.timestamp.desc()).offset(offset).limit(per_page)
+        # Get results ordered by timestamp desc; one extra row tells whether
+        # another page follows
+        stmt = stmt.order_by(Message.timestamp.desc(), Message.id.desc()).offset(offset).limit(per_page + 1)
 
         result = await self.db.execute(stmt)
-        messages = result.scalars().all()
+        rows = result.all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        messages = [row.Message for row in rows]
+        total = await self._page_total(rows, offset, count_stmt)
 
         return {
             "items": messages,
@@ -65,36 +116,10 @@ class SearchService:
             "page": page,
             "per_page": per_page,
             "pages": (total + per_page - 1) // per_page if total > 0 else 0,
+            "has_more": has_more,
             "query": query,
         }
 
-    async def update_search_vector(self, message: Message):
-        """Update the search vector for a message."""
-        if message.content:
-            # Use raw SQL for tsvector update
-            await self.db.execute(
-                text("""
-                    UPDATE messages
-                    SET search_vector = to_tsvector('english', :content)
-                    WHERE id = :id
-                """),
-                {"content": message.content, "id": message.id},
-            )
-            await self.db.commit()
-
-    async def bulk_update_search_vectors(self, conversation_id: int):
-        """Update search vectors for all messages in a conversation."""
-        await self.db.execute(
-            text("""
-                UPDATE messages
-                SET search_vector = to_tsvector('english', COALESCE(content, ''))
-                WHERE conversation_id = :conversation_id
-            """),
-            {"conversation_id": conversation_id},
-        )
-        await self.db.commit()
-        logger.info(f"Updated search vectors for conversation {conversation_id}")
-
     async def search_conversations(
         self,
         query: str,
@@ -105,26 +130,20 @@ class SearchService:
         offset = (page - 1) * per_page
 
         # Simple ILIKE search for conversation names
+        predicate = Conversation.name.ilike(f"%{query}%")
         stmt = (
-            select(Conversation)
-            .where(Conversation.name.ilike(f"%{query}%"))
+            select(Conversation, func.count().over().label("total"))
+            .where(predicate)
             .order_by(Conversation.last_message_at.desc())
             .offset(offset)
             .limit(per_page)
         )
-
-        # Count total
-        count_stmt = (
-            select(func.count())
-            .select_from(Conversation)
-            .where(Conversation.name.ilike(f"%{query}%"))
-        )
-
-        total_result = await self.db.execute(count_stmt)
-        total = total_result.scalar() or 0
+        count_stmt = select(func.count()).select_from(Conversation).where(predicate)
 
         result = await self.db.execute(stmt)
-        conversations = result.scalars().all()
+        rows = result.all()
+        conversations = [row.Conversation for row in rows]
+        total = await self._page_total(rows, offset, count_stmt)
 
         return {
             "items": conversations,
@@ -134,41 +153,63 @@ class SearchService:
             "pages": (total + per_page - 1) // per_page if total > 0 else 0,
         }
 
+    async def _page_total(self, rows: list, offset: int, count_stmt) -> int:
+        """Total match count from a page's window column.
+
+        Past the last page there is no row to carry it, so it is counted.
+        """
+        if rows:
+            return rows[0].total
+        if offset:
+            return await self.db.scalar(count_stmt) or 0
+        return 0
+
     async def get_message_context(
         self,
         message_id: int,
         context_size: int = 5,
     ) -> dict:
-        """Get messages around a specific message for context."""
-        # Get the target message
-        target = await self.db.get(Message, message_id)
-        if not target:
-            return {"before": [], "target": None, "after": []}
-
-        # Get messages before
-        before_stmt = (
-            select(Message)
-            .where(Message.conversation_id == target.conversation_id)
-            .where(Message.timestamp < target.timestamp)
+        """Get messages around a specific message for context.
+
+        The target and its neighbours on either side come back from a single
+        UNION ALL, tagged with the side they belong to.
+        """
+        target = (
+            select(Message.conversation_id, Message.timestamp)
+            .where(Message.id == message_id)
+            .cte("target")
+        )
+        before = (
+            select(Message.id, literal(-1).label("side"))
+            .where(Message.conversation_id == target.c.conversation_id)
+            .where(Message.timestamp < target.c.timestamp)
             .order_by(Message.timestamp.desc())
             .limit(context_size)
         )
-        before_result = await self.db.execute(before_stmt)
-        before = list(reversed(before_result.scalars().all()))
-
-        # Get messages after
-        after_stmt = (
-            select(Message)
-            .where(Message.conversation_id == target.conversation_id)
-            .where(Message.timestamp > target.timestamp)
+        after = (
+            select(Message.id, literal(1).label("side"))
+            .where(Message.conversation_id == target.c.conversation_id)
+            .where(Message.timestamp > target.c.timestamp)
             .order_by(Message.timestamp.asc())
             .limit(context_size)
         )
-        after_result = await self.db.execute(after_stmt)
-        after = list(after_result.scalars().all())
+        itself = select(Message.id, literal(0).label("side")).where(Message.id == message_id)
+        window = union_all(before, itself, after).subquery()
 
-        return {
-            "before": before,
-            "target": target,
-            "after": after,
-        }
+        stmt = (
+            select(Message, window.c.side)
+            .join(window, Message.id == window.c.id)
+            .options(selectinload(Message.media_files), raiseload("*"))
+            .order_by(Message.timestamp, Message.id)
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        context = {"before": [], "target": None, "after": []}
+        for row in rows:
+            if row.side < 0:
+                context["before"].append(row.Message)
+            elif row.side > 0:
+                context["after"].append(row.Message)
+            else:
+                context["target"] = row.Message
+        return context
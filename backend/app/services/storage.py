@@ -1,13 +1,154 @@
 from minio import Minio
+from minio.commonconfig import ComposeSource, ENABLED, Filter
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
-from io import BytesIO
-from typing import Optional, BinaryIO
+from minio.lifecycleconfig import AbortIncompleteMultipartUpload, Expiration, LifecycleConfig, Rule
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from io import BytesIO, RawIOBase
+from typing import Callable, Iterable, Iterator, Optional, BinaryIO
+from urllib.parse import quote
+import hashlib
+import hmac
 import logging
+import threading
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Smallest part MinIO accepts in a multipart upload, other than the last.
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Part size for streamed uploads of unknown length.
+STREAM_PART_SIZE = MIN_PART_SIZE
+
+# Most sources a single compose_object call accepts.
+COMPOSE_MAX_SOURCES = 10000
+
+# Chunk downloads kept in flight while assembling a chunked upload.
+ASSEMBLE_CONCURRENCY = 8
+
+# Objects larger than one part are downloaded as this many ranged GETs at once.
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
+DOWNLOAD_CONCURRENCY = 8
+
+# Presigned URLs are signed against a request date floored to this many
+# seconds, so every caller inside the same window gets an identical URL.
+PRESIGN_WINDOW_SECONDS = 300
+
+# Bucket lifecycle rules managed by _ensure_bucket; other rules are left alone.
+_LIFECYCLE_RULE_IDS = ("expire-import-uploads", "abort-incomplete-uploads")
+
+# Cached URLs stay valid for at least (expiry - window - ttl), i.e. 5 minutes
+# for the shortest (1 hour) expiry we hand out.
+_presigned_url_cache = TTLCache(maxsize=100_000, ttl=3000)
+_presigned_url_lock = threading.Lock()
+
+
+def _prefetch(pool: Executor, fn: Callable, items: Iterable, depth: int) -> Iterator:
+    """Yield fn(item) for each item in order, keeping up to depth calls in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class _ConcatStream(RawIOBase):
+    """Readable stream over byte strings pulled lazily from an iterator."""
+
+    def __init__(self, parts: Iterator[bytes]):
+        self._parts = parts
+        self._current = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            part = next(self._parts, None)
+            if part is None:
+                return 0
+            self._current = memoryview(part)
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+
+def _presign_request_date() -> datetime:
+    """Current time floored to the presign window."""
+    now = datetime.now(timezone.utc)
+    return now - timedelta(seconds=now.timestamp() % PRESIGN_WINDOW_SECONDS)
+
+
+class _PresignerV4:
+    """AWS SigV4 query-string signer for GET requests.
+
+    The signing key (date -> region -> service -> request chain) is derived
+    once per instance, so signing many objects only costs one canonical
+    request hash and one HMAC per key.
+    """
+
+    def __init__(self, request_date: datetime, expires: timedelta):
+        scheme = "https" if settings.minio_secure else "http"
+        host = settings.minio_endpoint
+        default_port = ":443" if settings.minio_secure else ":80"
+        if host.endswith(default_port):
+            host = host[: -len(default_port)]
+
+        self.base_url = f"{scheme}://{settings.minio_endpoint}"
+        self.host = host
+        self.amz_date = request_date.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = request_date.strftime("%Y%m%d")
+        self.scope = f"{date_stamp}/{settings.minio_region}/s3/aws4_request"
+
+        credential = f"{settings.minio_access_key}/{self.scope}"
+        self.query = "&".join(
+            f"{k}={quote(v, safe='')}"
+            for k, v in (
+                ("X-Amz-Algorithm", "AWS4-HMAC-SHA256"),
+                ("X-Amz-Credential", credential),
+                ("X-Amz-Date", self.amz_date),
+                ("X-Amz-Expires", str(int(expires.total_seconds()))),
+                ("X-Amz-SignedHeaders", "host"),
+            )
+        )
+
+        key = ("AWS4" + settings.minio_secret_key).encode("utf-8")
+        for part in (date_stamp, settings.minio_region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+        self.signing_key = key
+
+    def sign(self, bucket: str, object_name: str) -> str:
+        path = f"/{bucket}/{quote(object_name, safe='/~')}"
+        canonical_request = "\n".join([
+            "GET",
+            path,
+            self.query,
+            f"host:{self.host}",
+            "",
+            "host",
+            "UNSIGNED-PAYLOAD",
+        ])
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            self.amz_date,
+            self.scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ])
+        signature = hmac.new(
+            self.signing_key, string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        return f"{self.base_url}{path}?{self.query}&X-Amz-Signature={signature}"
+
 
 class StorageService:
     """MinIO storage service for media files."""
@@ -18,12 +159,13 @@ class StorageService:
             access_key=settings.minio_access_key,
             secret_key=settings.minio_secret_key,
             secure=settings.minio_secure,
+            region=settings.minio_region,
         )
         self.bucket = settings.minio_bucket
         self._ensure_bucket()
 
     def _ensure_bucket(self):
-        """Ensure the bucket exists."""
+        """Ensure the bucket exists and has our lifecycle rules."""
         try:
             if not self.client.bucket_exists(self.bucket):
                 self.client.make_bucket(self.bucket)
@@ -31,6 +173,39 @@ class StorageService:
         except S3Error as e:
             logger.error(f"Error ensuring bucket: {e}")
             raise
+        self._ensure_lifecycle()
+
+    def _ensure_lifecycle(self):
+        """Expire abandoned import uploads and incomplete multipart uploads.
+
+        Uploads that are never finished or started leave their chunks under
+        imports/, and interrupted put_object calls leave multipart parts
+        behind; MinIO cleans both up. Failing to set the rules (e.g. missing
+        permissions) is not fatal.
+        """
+        rules = [
+            Rule(
+                ENABLED,
+                rule_filter=Filter(prefix="imports/"),
+                rule_id="expire-import-uploads",
+                expiration=Expiration(days=settings.import_upload_expiry_days),
+            ),
+            Rule(
+                ENABLED,
+                rule_filter=Filter(prefix=""),
+                rule_id="abort-incomplete-uploads",
+                abort_incomplete_multipart_upload=AbortIncompleteMultipartUpload(days_after_initiation=1),
+            ),
+        ]
+        try:
+            current = self.client.get_bucket_lifecycle(self.bucket)
+            other_rules = [
+                rule for rule in (current.rules if current else [])
+                if rule.rule_id not in _LIFECYCLE_RULE_IDS
+            ]
+            self.client.set_bucket_lifecycle(self.bucket, LifecycleConfig(other_rules + rules))
+        except S3Error as e:
+            logger.warning(f"Could not set lifecycle rules on {self.bucket}: {e}")
 
     def upload_file(
         self,
@@ -38,8 +213,20 @@ class StorageService:
         data: BinaryIO,
         length: int,
         content_type: str = "application/octet-stream",
+        parallel: bool = False,
     ) -> str:
-        """Upload a file to MinIO."""
+        """Upload a file to MinIO. Pass length=-1 to stream unknown-size data in parts.
+
+        With parallel set, objects of at least settings.upload_part_size go up
+        in parts of that size, settings.upload_parallelism at a time. That can
+        hold parallelism + 1 parts in memory, so it is meant for single large
+        objects, not for uploads that already run many at once.
+        """
+        part_size = STREAM_PART_SIZE if length < 0 else 0
+        options = {}
+        if parallel and length >= settings.upload_part_size:
+            part_size = settings.upload_part_size
+            options["num_parallel_uploads"] = settings.upload_parallelism
         try:
             self.client.put_object(
                 self.bucket,
@@ -47,6 +234,8 @@ class StorageService:
                 data,
                 length,
                 content_type=content_type,
+                part_size=part_size,
+                **options,
             )
             logger.info(f"Uploaded: {object_name}")
             return object_name
@@ -80,6 +269,46 @@ class StorageService:
             logger.error(f"Error downloading {object_name}: {e}")
             raise
 
+    def download_file_parallel(self, object_name: str) -> BytesIO:
+        """Download a large file from MinIO as concurrent ranged GETs.
+
+        Each range is copied straight into its place in one preallocated
+        buffer, so the file is held in memory once. Objects up to
+        DOWNLOAD_PART_SIZE come down in a single request. Returns a stream
+        positioned at the start.
+        """
+        try:
+            size = self.client.stat_object(self.bucket, object_name).size
+            if size <= DOWNLOAD_PART_SIZE:
+                return BytesIO(self.download_file(object_name))
+
+            buffer = BytesIO()
+            # Writing the last byte sizes the buffer in one allocation
+            buffer.seek(size - 1)
+            buffer.write(b"\0")
+
+            with buffer.getbuffer() as view:
+                def download_range(offset: int) -> None:
+                    response = self.client.get_object(
+                        self.bucket, object_name, offset=offset, length=min(DOWNLOAD_PART_SIZE, size - offset)
+                    )
+                    try:
+                        data = response.read()
+                    finally:
+                        response.close()
+                        response.release_conn()
+                    view[offset:offset + len(data)] = data
+
+                with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as pool:
+                    # list() surfaces the first failed range
+                    list(pool.map(download_range, range(0, size, DOWNLOAD_PART_SIZE)))
+
+            buffer.seek(0)
+            return buffer
+        except S3Error as e:
+            logger.error(f"Error downloading {object_name}: {e}")
+            raise
+
     def download_bytes(self, object_name: str) -> Optional[bytes]:
         """Download a file from MinIO, returns None if not found."""
         try:
@@ -91,25 +320,58 @@ class StorageService:
         except S3Error:
             return None
 
+    @cached(
+        _presigned_url_cache,
+        key=lambda self, object_name, expires_hours=1: hashkey(object_name, expires_hours),
+        lock=_presigned_url_lock,
+    )
     def get_presigned_url(
         self,
         object_name: str,
         expires_hours: int = 1,
     ) -> str:
-        """Generate a presigned URL for temporary access."""
-        from datetime import timedelta
-
+        """Generate a presigned URL for temporary access (cached per key)."""
         try:
             url = self.client.presigned_get_object(
                 self.bucket,
                 object_name,
                 expires=timedelta(hours=expires_hours),
+                request_date=_presign_request_date(),
             )
             return url
         except S3Error as e:
             logger.error(f"Error generating presigned URL for {object_name}: {e}")
             raise
 
+    def presign_many(
+        self,
+        object_names: Iterable[str],
+        expires_hours: int = 1,
+    ) -> dict[str, str]:
+        """Generate presigned URLs for many objects in a single signing pass.
+
+        Shares the cache used by get_presigned_url; only misses are signed.
+        """
+        urls = {}
+        missing = []
+        with _presigned_url_lock:
+            for name in set(object_names):
+                url = _presigned_url_cache.get(hashkey(name, expires_hours))
+                if url is None:
+                    missing.append(name)
+                else:
+                    urls[name] = url
+
+        if missing:
+            signer = _PresignerV4(_presign_request_date(), timedelta(hours=expires_hours))
+            signed = {name: signer.sign(self.bucket, name) for name in missing}
+            with _presigned_url_lock:
+                for name, url in signed.items():
+                    _presigned_url_cache[hashkey(name, expires_hours)] = url
+            urls.update(signed)
+
+        return urls
+
     def delete_file(self, object_name: str):
         """Delete a file from MinIO."""
         try:
@@ -152,36 +414,59 @@ class StorageService:
     def append_chunk(
         self,
         object_name: str,
-        chunk_data: bytes,
+        chunk_data: BinaryIO,
         chunk_number: int,
-    ) -> str:
-        """Store a chunk for later assembly."""
-        chunk_key = f"{object_name}.chunk.{chunk_number:06d}"
-        self.upload_bytes(chunk_key, chunk_data)
-        return chunk_key
+        length: int = -1,
+    ) -> int:
+        """Store a chunk for later assembly, streaming it from a file object.
+
+        Returns the stored chunk's size.
+        """
+        chunk_key = self._chunk_key(object_name, chunk_number)
+        self.upload_file(chunk_key, chunk_data, length)
+        if length < 0:
+            length = self.client.stat_object(self.bucket, chunk_key).size
+        return length
 
     def assemble_chunks(
         self,
         object_name: str,
-        total_chunks: int,
+        chunk_sizes: list[int],
     ) -> str:
-        """Assemble chunks into a single file."""
-        # Collect all chunk data
-        all_data = BytesIO()
-
-        for i in range(total_chunks):
-            chunk_key = f"{object_name}.chunk.{i:06d}"
-            chunk_data = self.download_file(chunk_key)
-            all_data.write(chunk_data)
-            # Delete chunk after reading
-            self.delete_file(chunk_key)
-
-        # Upload assembled file
-        all_data.seek(0)
-        self.upload_file(
-            object_name,
-            all_data,
-            all_data.getbuffer().nbytes,
-        )
+        """Assemble stored chunks, given their sizes in order, into a single file.
+
+        When every chunk but the last is at least MIN_PART_SIZE, MinIO joins
+        them server-side with compose_object. Otherwise up to
+        ASSEMBLE_CONCURRENCY chunks are downloaded ahead and streamed in order
+        into the upload, so the whole file is never held in memory. The chunks
+        are deleted in one batch request afterwards.
+        """
+        chunk_keys = [self._chunk_key(object_name, i) for i in range(len(chunk_sizes))]
+
+        if len(chunk_keys) <= COMPOSE_MAX_SOURCES and all(
+            size >= MIN_PART_SIZE for size in chunk_sizes[:-1]
+        ):
+            sources = [ComposeSource(self.bucket, key) for key in chunk_keys]
+            self.client.compose_object(self.bucket, object_name, sources)
+            logger.info(f"Uploaded: {object_name} ({len(sources)} chunks composed)")
+        else:
+            with ThreadPoolExecutor(max_workers=ASSEMBLE_CONCURRENCY) as pool:
+                chunks = _prefetch(pool, self.download_file, chunk_keys, ASSEMBLE_CONCURRENCY)
+                self.upload_file(object_name, _ConcatStream(chunks), -1)
+
+        errors = self.client.remove_objects(self.bucket, [DeleteObject(key) for key in chunk_keys])
+        for error in errors:
+            logger.error(f"Error deleting {error.name}: {error.message}")
 
         return object_name
+
+    @staticmethod
+    def _chunk_key(object_name: str, chunk_number: int) -> str:
+        """Storage key of one chunk of a chunked upload."""
+        return f"{object_name}.chunk.{chunk_number:06d}"
+
+
+@lru_cache
+def get_storage() -> StorageService:
+    """Shared storage service, so the MinIO client and its pool are reused."""
+    return StorageService()
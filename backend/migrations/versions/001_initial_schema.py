@@ -0,0 +1,147 @@
+"""Initial schema
+
+Revision ID: 001_initial_schema
+Revises:
+Create Date: 2026-10-14
+
+The tables as the app first created them with metadata.create_all. Every
+step is IF NOT EXISTS, so databases set up that way before migrations
+existed are adopted as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("is_group", sa.Boolean(), nullable=True),
+        sa.Column("share_token", sa.String(64), nullable=True),
+        sa.Column("message_count", sa.Integer(), nullable=True),
+        sa.Column("first_message_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_conversations_id", "conversations", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_conversations_share_token", "conversations", ["share_token"], unique=True, if_not_exists=True
+    )
+
+    op.create_table(
+        "participants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "conversation_id",
+            sa.Integer(),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("phone_number", sa.String(50), nullable=True),
+        sa.Column("message_count", sa.Integer(), nullable=True),
+        sa.Column("color", sa.String(7), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_participants_id", "participants", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "conversation_id",
+            sa.Integer(),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "participant_id",
+            sa.Integer(),
+            sa.ForeignKey("participants.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("sender_name", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("message_type", sa.String(50), nullable=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("has_media", sa.Boolean(), nullable=True),
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_messages_id", "messages", ["id"], if_not_exists=True)
+    op.create_index("ix_messages_conversation_id", "messages", ["conversation_id"], if_not_exists=True)
+    op.create_index("ix_messages_timestamp", "messages", ["timestamp"], if_not_exists=True)
+    op.create_index(
+        "ix_messages_search_vector", "messages", ["search_vector"], postgresql_using="gin", if_not_exists=True
+    )
+    op.create_index(
+        "ix_messages_conversation_timestamp", "messages", ["conversation_id", "timestamp"], if_not_exists=True
+    )
+
+    op.create_table(
+        "media_files",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "message_id",
+            sa.Integer(),
+            sa.ForeignKey("messages.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("storage_key", sa.String(512), nullable=False),
+        sa.Column("original_filename", sa.String(255), nullable=True),
+        sa.Column("media_type", sa.String(50), nullable=False),
+        sa.Column("mime_type", sa.String(100), nullable=True),
+        sa.Column("file_size", sa.BigInteger(), nullable=True),
+        sa.Column("thumbnail_key", sa.String(512), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_media_files_id", "media_files", ["id"], if_not_exists=True)
+    op.create_index("ix_media_files_message_id", "media_files", ["message_id"], if_not_exists=True)
+
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "conversation_id",
+            sa.Integer(),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("filename", sa.String(255), nullable=True),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("total_chunks", sa.Integer(), nullable=True),
+        sa.Column("uploaded_chunks", sa.Integer(), nullable=True),
+        sa.Column("total_messages", sa.Integer(), nullable=True),
+        sa.Column("processed_messages", sa.Integer(), nullable=True),
+        sa.Column("total_media", sa.Integer(), nullable=True),
+        sa.Column("processed_media", sa.Integer(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("temp_storage_key", sa.String(512), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_import_jobs_id", "import_jobs", ["id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table("import_jobs")
+    op.drop_table("media_files")
+    op.drop_table("messages")
+    op.drop_table("participants")
+    op.drop_table("conversations")
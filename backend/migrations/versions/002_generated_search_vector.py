@@ -0,0 +1,43 @@
+"""Make messages.search_vector a generated column
+
+Revision ID: 002_generated_search_vector
+Revises: 001_initial_schema
+Create Date: 2026-10-14
+
+search_vector used to be filled in by the importer. A column can only
+become generated by being dropped and added again, which rewrites the
+messages table, so this is skipped when the column is already generated.
+"""
+from alembic import op
+
+
+revision = "002_generated_search_vector"
+down_revision = "001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'messages'
+              AND column_name = 'search_vector'
+              AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE messages DROP COLUMN search_vector;
+            ALTER TABLE messages ADD COLUMN search_vector tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED;
+            CREATE INDEX ix_messages_search_vector ON messages USING gin (search_vector);
+        END IF;
+    END
+    $$
+    """)
+
+
+def downgrade():
+    # Back to a plain column, filled from the generated values
+    op.execute("ALTER TABLE messages ALTER COLUMN search_vector DROP EXPRESSION")
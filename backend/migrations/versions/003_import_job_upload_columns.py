@@ -0,0 +1,29 @@
+"""Import job upload columns
+
+Revision ID: 003_import_job_upload_columns
+Revises: 002_generated_search_vector
+Create Date: 2026-10-14
+
+file_size becomes BIGINT, since exports with media can be larger than
+2 GiB. chunk_sizes records the chunks of an upload as they arrive, and
+import jobs get an index for the newest-first listing.
+"""
+from alembic import op
+
+
+revision = "003_import_job_upload_columns"
+down_revision = "002_generated_search_vector"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE import_jobs ALTER COLUMN file_size TYPE BIGINT")
+    op.execute("ALTER TABLE import_jobs ADD COLUMN IF NOT EXISTS chunk_sizes JSONB")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_import_jobs_created_at ON import_jobs (created_at DESC)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_import_jobs_created_at")
+    op.execute("ALTER TABLE import_jobs DROP COLUMN IF EXISTS chunk_sizes")
+    op.execute("ALTER TABLE import_jobs ALTER COLUMN file_size TYPE INTEGER")
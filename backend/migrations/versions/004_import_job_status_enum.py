@@ -0,0 +1,71 @@
+"""Import job status enum and updated_at trigger
+
+Revision ID: 004_import_job_status_enum
+Revises: 003_import_job_upload_columns
+Create Date: 2026-10-14
+
+import_jobs.status becomes the import_job_status enum instead of a
+VARCHAR. updated_at is bumped by a trigger, and only when the status
+changes; progress counter updates leave it alone.
+"""
+from alembic import op
+
+
+revision = "004_import_job_status_enum"
+down_revision = "003_import_job_upload_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The trigger references status, so it has to be out of the way while
+    # the column is converted
+    op.execute("DROP TRIGGER IF EXISTS import_jobs_touch_updated_at ON import_jobs")
+    op.execute("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'import_job_status') THEN
+            CREATE TYPE import_job_status AS ENUM
+                ('pending', 'uploading', 'processing', 'completed', 'failed');
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'import_jobs'
+              AND column_name = 'status'
+              AND data_type = 'character varying'
+        ) THEN
+            ALTER TABLE import_jobs
+                ALTER COLUMN status TYPE import_job_status
+                    USING coalesce(status, 'pending')::import_job_status,
+                ALTER COLUMN status SET NOT NULL;
+        END IF;
+    END
+    $$
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION import_jobs_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := now();
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER import_jobs_touch_updated_at
+        BEFORE UPDATE OF status ON import_jobs
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION import_jobs_touch_updated_at()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS import_jobs_touch_updated_at ON import_jobs")
+    op.execute("DROP FUNCTION IF EXISTS import_jobs_touch_updated_at()")
+    op.execute("""
+    ALTER TABLE import_jobs
+        ALTER COLUMN status DROP NOT NULL,
+        ALTER COLUMN status TYPE VARCHAR(50) USING status::text
+    """)
+    op.execute("DROP TYPE IF EXISTS import_job_status")
@@ -0,0 +1,40 @@
+"""Denormalized participant color on messages
+
+Revision ID: 005_message_participant_color
+Revises: 004_import_job_status_enum
+Create Date: 2026-10-14
+
+messages.participant_color is copied from the sender's participant so
+reads don't need a join. Existing messages are filled in when the column
+is added.
+"""
+from alembic import op
+
+
+revision = "005_message_participant_color"
+down_revision = "004_import_job_status_enum"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'messages'
+              AND column_name = 'participant_color'
+        ) THEN
+            ALTER TABLE messages ADD COLUMN participant_color VARCHAR(7);
+            UPDATE messages m SET participant_color = p.color
+                FROM participants p WHERE p.id = m.participant_id;
+        END IF;
+    END
+    $$
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE messages DROP COLUMN IF EXISTS participant_color")
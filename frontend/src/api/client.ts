@@ -29,8 +29,12 @@ export interface Conversation {
   participants: Participant[]
 }
 
+export interface ConversationListItem extends Omit<Conversation, 'participants'> {
+  participant_count: number
+}
+
 export interface ConversationList {
-  items: Conversation[]
+  items: ConversationListItem[]
   total: number
   page: number
   per_page: number
@@ -69,6 +73,7 @@ export interface MessageList {
   per_page: number
   pages: number
   has_more: boolean
+  next_cursor?: string | null
 }
 
 export interface ImportJob {
@@ -133,12 +138,12 @@ export const revokeShareLink = async (id: number): Promise<void> => {
 // Messages
 export const getMessages = async (
   conversationId: number,
-  page = 1,
+  cursor?: string,
   perPage = 50
 ): Promise<MessageList> => {
-  const { data } = await api.get(
-    `/messages/conversation/${conversationId}?page=${page}&per_page=${perPage}`
-  )
+  const params = new URLSearchParams({ per_page: String(perPage) })
+  if (cursor) params.append('cursor', cursor)
+  const { data } = await api.get(`/messages/conversation/${conversationId}?${params}`)
   return data
 }
 
@@ -197,8 +202,10 @@ export const getSharedConversation = async (token: string): Promise<Conversation
   return data
 }
 
-export const getSharedMessages = async (token: string, page = 1, perPage = 50): Promise<MessageList> => {
-  const { data } = await api.get(`/shared/${token}/messages?page=${page}&per_page=${perPage}`)
+export const getSharedMessages = async (token: string, cursor?: string, perPage = 50): Promise<MessageList> => {
+  const params = new URLSearchParams({ per_page: String(perPage) })
+  if (cursor) params.append('cursor', cursor)
+  const { data } = await api.get(`/shared/${token}/messages?${params}`)
   return data
 }
 
@@ -269,6 +276,15 @@ export interface AnalyticsResult {
   is_group_chat?: boolean
 }
 
+export interface AnalyticsJob {
+  conversation_id: number
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  run_id: string
+  error: string | null
+  // Set when a generation request was ignored for one already in flight
+  message?: string
+}
+
 export const getAnalyticsParticipants = async (conversationId: number): Promise<{ participants: AnalyticsParticipant[] }> => {
   const { data } = await api.get(`/analytics/${conversationId}/participants`)
   return data
@@ -287,7 +303,7 @@ export const generateAnalytics = async (
   conversationId: number,
   person1?: string,
   person2?: string
-): Promise<AnalyticsResult> => {
+): Promise<AnalyticsJob> => {
   const params = new URLSearchParams()
   // Only add params if both are provided (comparison mode)
   if (person1 && person2) {
@@ -300,4 +316,9 @@ export const generateAnalytics = async (
   return data
 }
 
+export const getAnalyticsStatus = async (conversationId: number): Promise<AnalyticsJob> => {
+  const { data } = await api.get(`/analytics/${conversationId}/status`)
+  return data
+}
+
 export default api
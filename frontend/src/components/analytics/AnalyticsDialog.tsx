@@ -1,10 +1,13 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { X, BarChart3, RefreshCw, ChevronDown, ChevronUp } from 'lucide-react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { getAnalyticsParticipants, generateAnalytics, getCachedAnalytics } from '../../api/client'
+import { getAnalyticsParticipants, generateAnalytics, getAnalyticsStatus, getCachedAnalytics } from '../../api/client'
 import type { AnalyticsResult, AnalyticsParticipant } from '../../api/client'
 import { format } from 'date-fns'
 
+// Give up polling if the server never reports the run as finished
+const STATUS_POLL_TIMEOUT_MS = 15 * 60 * 1000
+
 interface AnalyticsDialogProps {
   conversationId: number
   conversationName: string
@@ -17,6 +20,9 @@ export default function AnalyticsDialog({
   onClose,
 }: AnalyticsDialogProps) {
   const [expandedCalendars, setExpandedCalendars] = useState(false)
+  const [isGenerating, setIsGenerating] = useState(false)
+  const [generationStartedAt, setGenerationStartedAt] = useState(0)
+  const [pollFailed, setPollFailed] = useState(false)
   const queryClient = useQueryClient()
 
   // Fetch participants
@@ -41,12 +47,11 @@ export default function AnalyticsDialog({
   const person1 = is1to1Chat && participants[0] ? participants[0].name : undefined
   const person2 = is1to1Chat && participants[1] ? participants[1].name : undefined
 
-  // Generate analytics mutation
+  // Queue analytics generation; it runs in the background on the server
   const {
     mutate: generate,
-    data: generatedAnalytics,
-    isPending,
-    error,
+    isPending: isQueueing,
+    error: queueError,
   } = useMutation({
     mutationFn: () => generateAnalytics(
       conversationId,
@@ -54,13 +59,44 @@ export default function AnalyticsDialog({
       person2
     ),
     onSuccess: (data) => {
-      // Update the cached query with new data
-      queryClient.setQueryData(['analytics-cached', conversationId], data)
+      // Start polling from the queued status, not a previous run's result
+      queryClient.setQueryData(['analytics-status', conversationId], data)
+      setGenerationStartedAt(Date.now())
+      setPollFailed(false)
+      setIsGenerating(true)
     },
   })
 
-  // Use generated analytics if available, otherwise use cached
-  const analytics = generatedAnalytics || cachedAnalytics
+  // Poll generation status until it finishes
+  const { data: job, error: statusError, dataUpdatedAt } = useQuery({
+    queryKey: ['analytics-status', conversationId],
+    queryFn: () => getAnalyticsStatus(conversationId),
+    enabled: isGenerating,
+    refetchInterval: 1000,
+    retry: false,
+  })
+
+  useEffect(() => {
+    if (!isGenerating) return
+    // A 404 means the server lost track of the run
+    if (statusError || Date.now() - generationStartedAt > STATUS_POLL_TIMEOUT_MS) {
+      setIsGenerating(false)
+      setPollFailed(true)
+      return
+    }
+    if (!job) return
+    if (job.status === 'completed') {
+      setIsGenerating(false)
+      // Fresh results are served by the cached analytics endpoint
+      queryClient.invalidateQueries({ queryKey: ['analytics-cached', conversationId] })
+    } else if (job.status === 'failed') {
+      setIsGenerating(false)
+    }
+  }, [isGenerating, job, dataUpdatedAt, statusError, generationStartedAt, conversationId, queryClient])
+
+  const isPending = isQueueing || isGenerating
+  const error = queueError || pollFailed || (!isGenerating && job?.status === 'failed')
+  const analytics = cachedAnalytics
 
   return (
     <div className="fixed inset-0 bg-black/50 z-50 overflow-y-auto">
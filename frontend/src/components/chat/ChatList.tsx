@@ -1,9 +1,9 @@
 import { format } from 'date-fns'
 import { Users, User } from 'lucide-react'
-import type { Conversation } from '../../api/client'
+import type { ConversationListItem } from '../../api/client'
 
 interface ChatListProps {
-  conversations: Conversation[]
+  conversations: ConversationListItem[]
   onSelect: (id: number) => void
 }
 
@@ -39,8 +39,8 @@ export default function ChatList({ conversations, onSelect }: ChatListProps) {
             </div>
             <p className="text-sm text-gray-500 truncate">
               {conversation.message_count.toLocaleString()} messages
-              {conversation.participants.length > 0 && (
-                <> · {conversation.participants.length} participants</>
+              {conversation.participant_count > 0 && (
+                <> · {conversation.participant_count} participants</>
               )}
             </p>
           </div>
@@ -9,6 +9,7 @@ interface FileUploaderProps {
 }
 
 const CHUNK_SIZE = 5 * 1024 * 1024 // 5MB
+const UPLOAD_CONCURRENCY = 4 // Chunks in flight at once
 const SIMPLE_UPLOAD_THRESHOLD = 50 * 1024 * 1024 // 50MB
 
 export default function FileUploader({ onComplete, onError }: FileUploaderProps) {
@@ -55,15 +56,26 @@ export default function FileUploader({ onComplete, onError }: FileUploaderProps)
         // Chunked upload for larger files
         const totalChunks = Math.ceil(file.size / CHUNK_SIZE)
         job = await initImport(file.name, file.size, totalChunks)
-
-        for (let i = 0; i < totalChunks; i++) {
-          const start = i * CHUNK_SIZE
-          const end = Math.min(start + CHUNK_SIZE, file.size)
-          const chunk = file.slice(start, end)
-
-          await uploadChunk(job.id, i, chunk)
-          setProgress(Math.round(((i + 1) / totalChunks) * 100))
+        const jobId = job.id
+
+        // Chunks are stored separately and joined once all have arrived
+        // (CHUNK_SIZE is MinIO's minimum part size, so they are composed
+        // server-side), so they can be sent out of order
+        let nextChunk = 0
+        let uploadedChunks = 0
+        const uploadChunks = async () => {
+          while (nextChunk < totalChunks) {
+            const i = nextChunk++
+            const start = i * CHUNK_SIZE
+            const end = Math.min(start + CHUNK_SIZE, file.size)
+            const chunk = file.slice(start, end)
+
+            await uploadChunk(jobId, i, chunk)
+            uploadedChunks++
+            setProgress(Math.round((uploadedChunks / totalChunks) * 100))
+          }
         }
+        await Promise.all(Array.from({ length: Math.min(UPLOAD_CONCURRENCY, totalChunks) }, uploadChunks))
       }
 
       // Start processing
@@ -37,9 +37,9 @@ export default function ChatPage() {
     isLoading: isLoadingMessages,
   } = useInfiniteQuery({
     queryKey: ['messages', conversationId],
-    queryFn: ({ pageParam = 1 }) => getMessages(conversationId, pageParam, 100),
-    getNextPageParam: (lastPage) => (lastPage.has_more ? lastPage.page + 1 : undefined),
-    initialPageParam: 1,
+    queryFn: ({ pageParam }) => getMessages(conversationId, pageParam, 100),
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    initialPageParam: undefined as string | undefined,
   })
 
   // Search messages
@@ -27,9 +27,9 @@ export default function SharedPage() {
     isLoading: isLoadingMessages,
   } = useInfiniteQuery({
     queryKey: ['shared-messages', token],
-    queryFn: ({ pageParam = 1 }) => getSharedMessages(token!, pageParam, 100),
-    getNextPageParam: (lastPage) => (lastPage.has_more ? lastPage.page + 1 : undefined),
-    initialPageParam: 1,
+    queryFn: ({ pageParam }) => getSharedMessages(token!, pageParam, 100),
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    initialPageParam: undefined as string | undefined,
     enabled: !!token && !!conversation,
   })
 
@@ -21,27 +21,36 @@ USAGE
 COMMANDS
 --------
     init      - First-time setup: install dependencies, create database tables
+    migrate   - Apply pending database migrations (run once per deploy)
     backend   - Start the backend API server (port 8000)
+    serve     - Start the backend API server for production, no reload
     frontend  - Start the frontend dev server (port 5173)
     dev       - Start both backend and frontend for development
     check     - Verify configuration and dependencies
+                (--deep also logs in to PostgreSQL)
     help      - Show this help message
 
 EXAMPLES
 --------
     python start.py init                                    # First time setup
+    python start.py migrate                                 # After pulling schema changes
     python start.py dev                                     # Start development servers
     python start.py backend                                 # Start only backend
+    python start.py serve                                   # Production backend
+    python start.py check --deep                            # Full connection check
     WH_ARCH_ENV_FILE=/path/to/.env python start.py dev     # Use custom config
 """
 
 import os
 import sys
+import socket
 import subprocess
 import shutil
 import signal
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from urllib.parse import urlsplit
+from typing import NamedTuple, Optional, Tuple
 import argparse
 
 # =============================================================================
@@ -105,6 +114,27 @@ def print_section(title: str):
     print(f"\n{Colors.BOLD}{title}{Colors.NC}")
 
 
+class CheckResult(NamedTuple):
+    """Outcome of a check, printed by print_check."""
+    name: str
+    ok: bool
+    message: str
+    warning: bool = False  # print as a warning instead of a success/error
+    hint: Optional[str] = None  # extra line printed underneath
+
+
+def print_check(result: CheckResult):
+    line = f"{result.name}: {result.message}"
+    if result.warning:
+        print_warning(line)
+    elif result.ok:
+        print_success(line)
+    else:
+        print_error(line)
+    if result.hint:
+        print(f"         {result.hint}")
+
+
 # =============================================================================
 # Configuration Loading
 # =============================================================================
@@ -193,39 +223,40 @@ def check_command(name: str) -> Tuple[bool, str]:
         return False, str(e)
 
 
-def check_python() -> bool:
+def check_python() -> CheckResult:
     found, version = check_command("python3")
-    if found:
-        print_success(f"Python: {version}")
-    else:
-        print_error(f"Python 3: {version}")
-    return found
+    return CheckResult("Python" if found else "Python 3", found, version)
 
 
-def check_node() -> bool:
+def check_node() -> CheckResult:
     found, version = check_command("node")
-    if found:
-        print_success(f"Node.js: {version}")
-    else:
-        print_error(f"Node.js: {version}")
-    return found
+    return CheckResult("Node.js", found, version)
 
 
-def check_npm() -> bool:
+def check_npm() -> CheckResult:
     found, version = check_command("npm")
-    if found:
-        print_success(f"npm: {version}")
-    else:
-        print_error(f"npm: {version}")
-    return found
+    return CheckResult("npm", found, version)
+
 
+def check_postgres(deep: bool = False) -> CheckResult:
+    """Check PostgreSQL is accepting connections.
 
-def check_postgres() -> bool:
-    """Check PostgreSQL connection."""
+    Only probes the TCP listener unless deep is set, which also logs in
+    with asyncpg.
+    """
     db_url = os.environ.get("DATABASE_URL")
     if not db_url:
-        print_error("DATABASE_URL not set")
-        return False
+        return CheckResult("PostgreSQL", False, "DATABASE_URL not set")
+
+    if not deep:
+        try:
+            url = urlsplit(db_url)
+            host, port = url.hostname or "localhost", url.port or 5432
+            with socket.create_connection((host, port), timeout=2):
+                pass
+            return CheckResult("PostgreSQL", True, f"listening at {host}:{port}")
+        except (OSError, ValueError) as e:
+            return CheckResult("PostgreSQL", False, str(e))
 
     try:
         import asyncio
@@ -239,70 +270,77 @@ def check_postgres() -> bool:
             return True
 
         asyncio.run(test_connection())
-        print_success("PostgreSQL: connected")
-        return True
+        return CheckResult("PostgreSQL", True, "connected")
     except ImportError:
-        print_warning("PostgreSQL: asyncpg not installed (run init first)")
-        return False
+        return CheckResult("PostgreSQL", False, "asyncpg not installed (run init first)", warning=True)
     except Exception as e:
-        print_error(f"PostgreSQL: {e}")
-        return False
+        return CheckResult("PostgreSQL", False, str(e))
 
 
-def check_minio() -> bool:
+def check_minio() -> CheckResult:
     """Check MinIO connection."""
     endpoint = os.environ.get("MINIO_ENDPOINT")
     if not endpoint:
-        print_error("MINIO_ENDPOINT not set")
-        return False
+        return CheckResult("MinIO", False, "MINIO_ENDPOINT not set")
 
     try:
         import urllib.request
         url = f"http://{endpoint}/minio/health/live"
-        urllib.request.urlopen(url, timeout=5)
-        print_success(f"MinIO: reachable at {endpoint}")
-        return True
+        urllib.request.urlopen(url, timeout=2)
+        return CheckResult("MinIO", True, f"reachable at {endpoint}")
     except Exception:
-        print_warning(f"MinIO: cannot reach {endpoint} (may still work)")
-        return True  # Non-critical
+        # Non-critical
+        return CheckResult("MinIO", True, f"cannot reach {endpoint} (may still work)", warning=True)
 
 
-def check_backend_deps() -> bool:
+def check_backend_deps() -> CheckResult:
     """Check if backend dependencies are installed."""
     try:
         import fastapi
         import sqlalchemy
         import minio
-        print_success("Backend dependencies: installed")
-        return True
+        return CheckResult("Backend dependencies", True, "installed")
     except ImportError:
-        print_warning("Backend dependencies: not fully installed")
-        print("         Run: python start.py init")
-        return False
+        return CheckResult(
+            "Backend dependencies", False, "not fully installed",
+            warning=True, hint="Run: python start.py init",
+        )
 
 
-def check_frontend_deps() -> bool:
+def check_frontend_deps() -> CheckResult:
     """Check if frontend dependencies are installed."""
     node_modules = FRONTEND_DIR / "node_modules"
     if node_modules.exists():
-        print_success("Frontend dependencies: installed")
-        return True
-    else:
-        print_warning("Frontend dependencies: not installed")
-        print("         Run: python start.py init")
-        return False
+        return CheckResult("Frontend dependencies", True, "installed")
+    return CheckResult(
+        "Frontend dependencies", False, "not installed",
+        warning=True, hint="Run: python start.py init",
+    )
 
 
 # =============================================================================
 # Commands
 # =============================================================================
 
+def run_migrations():
+    """Bring the database schema up to date with alembic."""
+    venv_alembic = BACKEND_DIR / "venv" / "bin" / "alembic"
+    if venv_alembic.exists():
+        alembic_cmd = str(venv_alembic)
+    else:
+        alembic_cmd = "alembic"
+
+    print_info("Applying database migrations...")
+    subprocess.run([alembic_cmd, "upgrade", "head"], cwd=BACKEND_DIR, check=True)
+    print_success("Database schema up to date")
+
+
 def cmd_help():
     """Show help message."""
     print(__doc__)
 
 
-def cmd_check():
+def cmd_check(deep: bool = False):
     """Verify configuration and dependencies."""
     print_header()
     print("Checking configuration and dependencies...")
@@ -310,18 +348,21 @@ def cmd_check():
     if not load_config():
         return 1
 
-    print_section("System")
-    check_python()
-    check_node()
-    check_npm()
-
-    print_section("Services")
-    check_postgres()
-    check_minio()
-
-    print_section("Project")
-    check_backend_deps()
-    check_frontend_deps()
+    sections = [
+        ("System", [check_python, check_node, check_npm]),
+        ("Services", [lambda: check_postgres(deep), check_minio]),
+        ("Project", [check_backend_deps, check_frontend_deps]),
+    ]
+
+    # The checks mostly wait on subprocesses and sockets, so run them all at
+    # once and print their results in the usual order afterwards
+    checks = [check for _, section_checks in sections for check in section_checks]
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        results = pool.map(lambda check: check(), checks)
+    for title, section_checks in sections:
+        print_section(title)
+        for _ in section_checks:
+            print_check(next(results))
 
     print()
     return 0
@@ -336,10 +377,11 @@ def cmd_init():
         return 1
 
     print_section("Checking system requirements")
-    if not check_python():
-        return 1
-    if not check_node():
-        return 1
+    for check in (check_python, check_node):
+        result = check()
+        print_check(result)
+        if not result.ok:
+            return 1
 
     # Install backend dependencies
     print_section("Installing backend dependencies")
@@ -365,27 +407,7 @@ def cmd_init():
 
     # Initialize database
     print_section("Initializing database")
-    python_path = venv_dir / "bin" / "python"
-
-    init_script = '''
-import asyncio
-import sys
-sys.path.insert(0, ".")
-from app.database import init_db
-
-async def setup():
-    await init_db()
-    print("Database tables created")
-
-asyncio.run(setup())
-'''
-
-    subprocess.run(
-        [str(python_path), "-c", init_script],
-        cwd=BACKEND_DIR,
-        check=True
-    )
-    print_success("Database initialized")
+    run_migrations()
 
     # MinIO bucket info
     print()
@@ -402,6 +424,17 @@ asyncio.run(setup())
     return 0
 
 
+def cmd_migrate():
+    """Apply pending database migrations."""
+    print_header()
+
+    if not load_config():
+        return 1
+
+    run_migrations()
+    return 0
+
+
 def cmd_backend():
     """Start the backend API server."""
     print_header()
@@ -427,6 +460,44 @@ def cmd_backend():
     os.execvp(uvicorn_cmd, [uvicorn_cmd, "app.main:app", "--reload", "--port", "8000"])
 
 
+def cmd_serve():
+    """Start the backend API server for production, no reload.
+
+    Worker count comes from WEB_CONCURRENCY, defaulting to 1: search cache
+    invalidation only reaches the worker that made the change, so other
+    workers can serve stale search results until their cache expires.
+    """
+    print_header()
+
+    if not load_config():
+        return 1
+
+    print()
+
+    # Determine uvicorn path
+    venv_uvicorn = BACKEND_DIR / "venv" / "bin" / "uvicorn"
+    if venv_uvicorn.exists():
+        uvicorn_cmd = str(venv_uvicorn)
+    else:
+        uvicorn_cmd = "uvicorn"
+
+    workers = os.environ.get("WEB_CONCURRENCY") or "1"
+
+    print_info(f"Starting backend server with {workers} worker(s)...")
+    print(f"         URL: http://localhost:8000")
+    print()
+
+    os.chdir(BACKEND_DIR)
+    os.execvp(uvicorn_cmd, [
+        uvicorn_cmd, "app.main:app",
+        "--host", "0.0.0.0",
+        "--port", "8000",
+        "--workers", workers,
+        "--loop", "uvloop",
+        "--http", "httptools",
+    ])
+
+
 def cmd_frontend():
     """Start the frontend dev server."""
     print_header()
@@ -525,37 +596,41 @@ def main():
         description="WhatsApp Archive - Development & Deployment Script",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
-Commands:
-  init      First-time setup: install dependencies, create database tables
-  backend   Start the backend API server (port 8000)
-  frontend  Start the frontend dev server (port 5173)
-  dev       Start both backend and frontend for development
-  check     Verify configuration and dependencies
-  help      Show detailed help message
-
 Examples:
   python start.py init                                    # First time setup
   python start.py dev                                     # Start dev servers
+  python start.py check --deep                            # Full connection check
   WH_ARCH_ENV_FILE=/path/to/.env python start.py dev     # Custom config
         """
     )
 
-    parser.add_argument(
-        "command",
-        nargs="?",
-        default="help",
-        choices=["init", "backend", "frontend", "dev", "check", "help"],
-        help="Command to run"
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.add_parser("init", help="First-time setup: install dependencies, create database tables")
+    subparsers.add_parser("migrate", help="Apply pending database migrations (run once per deploy)")
+    subparsers.add_parser("backend", help="Start the backend API server (port 8000)")
+    subparsers.add_parser(
+        "serve", help="Start the backend for production (WEB_CONCURRENCY workers, default 1)"
+    )
+    subparsers.add_parser("frontend", help="Start the frontend dev server (port 5173)")
+    subparsers.add_parser("dev", help="Start both backend and frontend for development")
+    check_parser = subparsers.add_parser("check", help="Verify configuration and dependencies")
+    check_parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Log in to PostgreSQL instead of only probing its port",
     )
+    subparsers.add_parser("help", help="Show detailed help message")
 
     args = parser.parse_args()
 
     commands = {
         "init": cmd_init,
+        "migrate": cmd_migrate,
         "backend": cmd_backend,
+        "serve": cmd_serve,
         "frontend": cmd_frontend,
         "dev": cmd_dev,
-        "check": cmd_check,
+        "check": lambda: cmd_check(deep=args.deep),
         "help": cmd_help,
     }
 